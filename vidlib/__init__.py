@@ -1,6 +1,95 @@
-from .slide import *
-from .image import *
-from .plot import *
-from .animate import *
-from .filter import *
-from .constants import *
\ No newline at end of file
+"""Submodules are imported on first access, so that e.g. `from vidlib import
+colorscheme` or `from vidlib.utils import filter_by_lim` do not start manim.
+`from vidlib import *` still imports every submodule in this order and exports
+the same names as star-importing them one after the other did."""
+import importlib
+import importlib.util
+import sys
+
+_modules = ["slide", "image", "plot", "animate", "filter", "text", "constants"]
+
+# where the names vidlib defines live, anything else (e.g. what the submodules
+# star-import from manimlib) is found by importing all of them
+_names = {
+    "colorscheme": "colors",
+    "to_rgba": "colors",
+    "to_rgba_array": "colors",
+    "to_hex": "colors",
+    "Colormap": "colors",
+    "get_colormap": "colors",
+    "set_point_colors": "colors",
+    "set_stroke_colors": "colors",
+    "C": "slide",
+    "Slide": "slide",
+    "LazySlide": "slide",
+    "SlideShow": "slide",
+    "SceneCheckpoint": "slide",
+    "MultiLevelText": "slide",
+    "MyImageMobject": "image",
+    "SkyPanZoom": "image",
+    "STRETCHES": "image",
+    "TEXTURE_CACHE_SIZE": "image",
+    "ImagePyramid": "image",
+    "TiledImageMobject": "image",
+    "filter_by_lim": "utils",
+    "c2hex": "utils",
+    "p2refp": "utils",
+    "MyAxes": "plot",
+    "MplAxisWrapper": "plot",
+    "MyNumberLine": "plot",
+    "minmax_decimate": "plot",
+    "lttb_decimate": "plot",
+    "get_scale_functions": "plot",
+    "get_scale_config": "plot",
+    "endless_loop": "animate",
+    "EndlessLoopTracker": "animate",
+    "find_by_type": "filter",
+    "find_by_field": "filter",
+    "MobjectIndex": "filter",
+    "TextCache": "text",
+    "text_cache": "text",
+    "cached_text": "text",
+    "FW": "constants",
+    "FH": "constants",
+    "CACHE_DIR": "constants",
+}
+
+
+def _load_all():
+    """import all submodules and return the names their star imports export,
+    later modules taking precedence as they used to"""
+    exported = {}
+    for name in _modules:
+        module = importlib.import_module(f".{name}", __name__)
+        public = getattr(module, "__all__", None)
+        if public is None:
+            public = [key for key in vars(module) if not key.startswith("_")]
+        for key in public:
+            exported[key] = getattr(module, key)
+    # names of submodules are the submodules, not what was star-imported
+    # under them, e.g. manimlib.constants
+    for key in exported:
+        exported[key] = sys.modules.get(f"{__name__}.{key}", exported[key])
+    globals().update(exported)
+    globals()["__all__"] = list(exported)
+    return exported
+
+
+def __getattr__(name):
+    if name in _names:
+        value = getattr(importlib.import_module(f".{_names[name]}", __name__), name)
+        globals()[name] = value
+        return value
+    if name.startswith("__") and name != "__all__":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    if importlib.util.find_spec(f".{name}", __name__) is not None:
+        return importlib.import_module(f".{name}", __name__)
+    if name == "__all__" or "__all__" not in globals():
+        exported = _load_all()
+        if name == "__all__": return list(exported)
+        if name in exported: return exported[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_names))
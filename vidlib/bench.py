@@ -0,0 +1,504 @@
+"""Micro benchmarks for vidlib's hot paths. Run with
+
+    python -m vidlib.bench [names] [--quick] [--output results.json]
+                           [--baseline baseline.json] [--threshold 0.25]
+
+They never open a window, and benchmarks that need something missing here
+(e.g. an OpenGL context for to_pdf) are skipped. Timings are saved as json and
+compared with a baseline, exiting with 1 when one got slower than the
+threshold allows.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# name -> benchmark function, and the smaller arguments used with --quick
+BENCHMARKS = {}
+QUICK = {}
+
+
+class SkipBenchmark(Exception):
+    pass
+
+
+def register(name, **quick):
+    def decorator(func):
+        BENCHMARKS[name] = func
+        QUICK[name] = quick
+        return func
+    return decorator
+
+
+def timeit(f, repeat=5):
+    """best wall-clock time of f() out of a few repeats, in seconds"""
+    best = np.inf
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        f()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def _report(title, rows, header, n_keys=1, times=None):
+    """Print rows as a table and return their timings as {"key/column": value},
+    where the first n_keys columns make the key and times are the indices of
+    the columns holding timings (all other columns by default). Timings that
+    are not finite, i.e. not measured or failed, are None."""
+    print(f"# {title}")
+    print("  ".join(f"{h:>14}" for h in header))
+    for row in rows:
+        print("  ".join(f"{v:>14.4g}" if isinstance(v, float) else f"{v:>14}" for v in row))
+    print()
+    if times is None: times = range(n_keys, len(header))
+    metrics = {}
+    for row in rows:
+        key = ",".join(f"{header[i]}={row[i]}" for i in range(n_keys))
+        for i in times:
+            metrics[f"{key}/{header[i]}"] = float(row[i]) if np.isfinite(row[i]) else None
+    return metrics
+
+
+def _make_image(shape=(64, 128)):
+    """write a small random image to a temporary file and return its path"""
+    from PIL import Image
+    fd, path = tempfile.mkstemp(suffix=".png")
+    os.close(fd)
+    arr = (np.random.rand(*shape, 3)*255).astype(np.uint8)
+    Image.fromarray(arr).save(path)
+    return path
+
+
+@register("image_transforms", sizes=(10, 10**3, 10**5))
+def bench_image_transforms(sizes=(10, 10**2, 10**3, 10**4, 10**5, 10**6), loop_max=10**4):
+    """time MyImageMobject.sky2p / p2sky on (N, 2) arrays of catalog positions,
+    with a per-point python loop as reference for small N"""
+    from vidlib.image import MyImageMobject
+    path = _make_image()
+    try:
+        im = MyImageMobject(path, extent=(-10, 10, -5, 5))
+    finally:
+        os.remove(path)
+    rows = []
+    for n in sizes:
+        sky = np.random.uniform((-10, -5), (10, 5), size=(n, 2))
+        t_fwd = timeit(lambda: im.sky2p(sky))
+        points = im.sky2p(sky)
+        t_inv = timeit(lambda: im.p2sky(points))
+        if n <= loop_max:
+            t_loop = timeit(lambda: [im.sky2p(tuple(c)) for c in sky], repeat=1)
+        else:
+            t_loop = np.nan
+        rows.append((n, t_fwd/n*1e9, t_inv/n*1e9, t_loop/n*1e9))
+    return _report("MyImageMobject sky2p / p2sky (ns per point)", rows,
+                   ("N", "sky2p", "p2sky", "sky2p loop"))
+
+
+def _make_axis(n_lines, n_samples):
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    fig, ax = plt.subplots()
+    x = np.linspace(0, 10, n_samples)
+    for i in range(n_lines):
+        ax.plot(x, np.sin(x + i/n_lines))
+    return ax
+
+
+@register("mpl_wrapper", n_lines=(1, 10), n_samples=(100,))
+def bench_mpl_wrapper(n_lines=(1, 10, 50), n_samples=(100, 1000)):
+    """time MplAxisWrapper construction with the vectorized and the
+    ParametricCurve path for N lines x M samples"""
+    from vidlib.plot import MplAxisWrapper
+    rows = []
+    for n in n_lines:
+        for m in n_samples:
+            ax = _make_axis(n, m)
+            t_vec = timeit(lambda: MplAxisWrapper(ax, vectorized=True), repeat=3)
+            t_loop = timeit(lambda: MplAxisWrapper(ax, vectorized=False), repeat=1)
+            rows.append((n, m, t_vec, t_loop, t_loop/t_vec))
+    return _report("MplAxisWrapper construction (s)", rows,
+                   ("lines", "samples", "vectorized", "ParametricCurve", "speedup"),
+                   n_keys=2, times=(2, 3))
+
+
+@register("mpl_markers", sizes=(10**3, 10**4))
+def bench_mpl_markers(sizes=(10**3, 10**4, 10**5)):
+    """time MplAxisWrapper construction for a scatter plot of N markers, against
+    the empty axis, and one Dot per marker as PointCloud does for reference"""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from manimlib import Dot
+    from vidlib.plot import MplAxisWrapper
+    fig, ax = plt.subplots()
+    t_axis = timeit(lambda: MplAxisWrapper(ax), repeat=3)
+    rows = []
+    for n in sizes:
+        for coll in list(ax.collections): coll.remove()
+        ax.scatter(np.random.rand(n), np.random.rand(n), s=np.random.rand(n)*20, c=np.random.rand(n))
+        t = timeit(lambda: MplAxisWrapper(ax), repeat=3) - t_axis
+        n_dots = min(n, 10**3)
+        t_dots = timeit(lambda: [Dot() for _ in range(n_dots)], repeat=1)/n_dots*n
+        rows.append((n, t, t/n*1e6, t_dots))
+    return _report("MplAxisWrapper scatter markers", rows,
+                   ("N", "time (s)", "us per marker", "Dot per marker (s)"))
+
+
+@register("axes_markers", sizes=(10, 10**3))
+def bench_axes_markers(sizes=(10, 10**3, 10**5), loop_max=10**4):
+    """time MyAxes.plot of N markers, which maps all points in one pass, with
+    a per-point c2p loop as reference for small N"""
+    from vidlib.plot import MyAxes
+    axes = MyAxes()
+    rows = []
+    for n in sizes:
+        x, y = np.random.uniform(-5, 5, (2, n))
+        t = timeit(lambda: axes.plot(x, y, fmt='o'), repeat=3)
+        if n <= loop_max:
+            expected = np.array([axes.c2p(xi, yi) for xi, yi in zip(x, y)])
+            assert np.allclose(axes.coords_to_points(x, y), expected)
+            t_loop = timeit(lambda: [axes.c2p(xi, yi) for xi, yi in zip(x, y)], repeat=1)
+        else:
+            t_loop = np.nan
+        rows.append((n, t, t_loop))
+    return _report("MyAxes.plot markers (s)", rows, ("N", "plot", "c2p loop"))
+
+
+@register("culling", sizes=(10**4, 10**5))
+def bench_culling(sizes=(10**4, 10**5, 10**6, 10**7), depth=6):
+    """time building the Octree of a point cloud and one frustum query from a
+    rotated camera frame, as done every frame by CulledPointCloud"""
+    from manimlib.camera.camera import CameraFrame
+    from manimlib.constants import DEGREES
+    from vidlib.three import Octree, get_frustum_planes
+    frame = CameraFrame()
+    frame.set_euler_angles(theta=30*DEGREES, phi=70*DEGREES)
+    rows = []
+    for n in sizes:
+        points = np.random.randn(n, 3)*5
+        t_build = timeit(lambda: Octree(points, depth), repeat=1)
+        tree = Octree(points, depth)
+        t_query = timeit(lambda: tree.query_planes(get_frustum_planes(frame), points))
+        n_visible = len(tree.query_planes(get_frustum_planes(frame), points))
+        rows.append((n, t_build, t_query*1e3, n_visible))
+    return _report("CulledPointCloud octree", rows, ("N", "build (s)", "query (ms)", "visible"),
+                   times=(1, 2))
+
+
+def _find_by_type_recursive(mob, typ, recursive=False):
+    """find_by_type as it was before it walked an explicit stack, for reference"""
+    res = []
+    if isinstance(mob, typ):
+        return [mob]
+    elif isinstance(mob, list):
+        for m in mob:
+            res += _find_by_type_recursive(m, typ, recursive=recursive)
+        return res
+    elif recursive:
+        mobs = [getattr(mob, field) for field in ["submobjects", "mobjects"] if hasattr(mob, field)]
+        if len(mobs) == 0: return []
+        else:
+            mobs = [mob for sublist in mobs for mob in sublist]
+            return _find_by_type_recursive(mobs, typ, recursive=recursive)
+    else: return res
+
+
+def _find_by_field_recursive(mobs, field, value):
+    res = []
+    if isinstance(mobs, list):
+        for mob in mobs:
+            res += _find_by_field_recursive(mob, field, value)
+        return res
+    elif hasattr(mobs, field) and (getattr(mobs, field) == value or value in getattr(mobs, field)):
+        return [mobs]
+    else:
+        return []
+
+
+@register("find", sizes=(10**3, 10**4))
+def bench_find(sizes=(10**3, 10**4, 10**5), group_size=10):
+    """time finding the 1 in 10 Points in a tree of N mobjects by type and the
+    1 in 100 by a field value, recursively as before, with the explicit stack
+    of find_by_type / find_by_field, and with a MobjectIndex"""
+    from manimlib import Group, Mobject, Point
+    from vidlib.filter import MobjectIndex, find_by_field, find_by_type
+    rows = []
+    for n in sizes:
+        mobs = []
+        for i in range(n):
+            mob = Point() if i % 10 == 0 else Mobject()
+            mob.tag = f"tag{i % 100}"
+            mobs.append(mob)
+        groups = [Group(*mobs[i:i+group_size]) for i in range(0, n, group_size)]
+        root = Group(*groups)
+        flat = root.get_family()
+        index = MobjectIndex(fields=["tag"])
+        t_index_build = timeit(lambda: MobjectIndex(fields=["tag"]).add(root), repeat=1)
+        index.add(root)
+        t_rec = timeit(lambda: _find_by_type_recursive(root, Point, recursive=True), repeat=3)
+        t_iter = timeit(lambda: find_by_type(root, Point, recursive=True), repeat=3)
+        t_index = timeit(lambda: index.find_by_type(Point))
+        t_field_rec = timeit(lambda: _find_by_field_recursive(flat, "tag", "tag0"), repeat=3)
+        t_field_iter = timeit(lambda: find_by_field(flat, "tag", "tag0"), repeat=3)
+        t_field_index = timeit(lambda: index.find_by_field("tag", "tag0"))
+        rows.append((n, t_rec*1e3, t_iter*1e3, t_index*1e3,
+                     t_field_rec*1e3, t_field_iter*1e3, t_field_index*1e3, t_index_build))
+    return _report("find_by_type / find_by_field (ms)", rows,
+                   ("N", "type rec", "type stack", "type index",
+                    "field rec", "field stack", "field index", "index build (s)"))
+
+
+_IMPORT_SCRIPT = """
+import sys, time
+t0 = time.perf_counter()
+import {module}
+print(time.perf_counter() - t0, "manimlib" in sys.modules, "matplotlib" in sys.modules)
+"""
+
+
+@register("import", modules=("vidlib", "vidlib.colors", "vidlib.slide"), repeat=1)
+def bench_import(modules=("vidlib", "vidlib.utils", "vidlib.colors", "vidlib.filter",
+                          "vidlib.pdf", "vidlib.timing", "vidlib.constants", "vidlib.text",
+                          "vidlib.animate", "vidlib.slide", "vidlib.image", "vidlib.plot",
+                          "vidlib.three"), repeat=3):
+    """time importing each module in a fresh interpreter, the cold start a
+    worker pays, and whether that pulled in manimlib or matplotlib"""
+    rows = []
+    for module in modules:
+        best, manim, mpl = np.inf, None, None
+        for _ in range(repeat):
+            out = subprocess.run([sys.executable, "-c", _IMPORT_SCRIPT.format(module=module)],
+                                 capture_output=True, text=True)
+            if out.returncode != 0: break
+            t, manim, mpl = out.stdout.split()
+            best = min(best, float(t))
+        rows.append((module, best*1e3 if manim else np.nan, manim or "failed", mpl or "failed"))
+    return _report("cold import (ms)", rows, ("module", "time", "manimlib", "matplotlib"),
+                   times=(1,))
+
+
+@register("number_line", sizes=(10**3, 10**5))
+def bench_number_line(sizes=(10**3, 10**4, 10**5, 10**6), scales=("linear", "log", "symlog"), loop_max=10**4):
+    """time MyNumberLine.number_to_point on arrays of N numbers for each scale,
+    with a per-number python loop as reference for small N"""
+    from vidlib.plot import MyNumberLine
+    rows = []
+    for scale in scales:
+        line = MyNumberLine(x_range=(1, 1000), xticks=[1, 10, 100, 1000], xscale=scale,
+                            include_numbers=False, include_tip=False)
+        for n in sizes:
+            x = np.random.uniform(1, 1000, n)
+            t = timeit(lambda: line.number_to_point(x))
+            t_loop = timeit(lambda: [line.number_to_point(v) for v in x], repeat=1) if n <= loop_max else np.nan
+            rows.append((scale, n, t/n*1e9, t_loop/n*1e9))
+    return _report("MyNumberLine.number_to_point (ns per number)", rows,
+                   ("scale", "N", "array", "loop"), n_keys=2)
+
+
+@register("point_cloud", sizes=(10**3, 10**4), loop_max=10**3)
+def bench_point_cloud(sizes=(10**3, 10**4, 10**5, 10**6), loop_max=10**4):
+    """time building a point cloud of N points as an ArrayPointCloud, and as a
+    PointCloud of one Dot per point for N up to loop_max"""
+    from vidlib.three import ArrayPointCloud, PointCloud
+    rows = []
+    for n in sizes:
+        xs, ys, zs = np.random.randn(3, n)
+        ss = np.random.rand(n)
+        t_array = timeit(lambda: ArrayPointCloud(xs, ys, zs, ss), repeat=3)
+        t_dots = timeit(lambda: PointCloud(xs, ys, zs, ss), repeat=1) if n <= loop_max else np.nan
+        rows.append((n, t_array, t_dots))
+    return _report("point cloud construction (s)", rows, ("N", "ArrayPointCloud", "PointCloud"))
+
+
+@register("image_crop", n_ops=100)
+def bench_image_crop(n_ops=1000):
+    """time cropping and scrolling a MyImageMobject, in sky and image coordinates"""
+    from vidlib.image import MyImageMobject
+    path = _make_image()
+    try:
+        im = MyImageMobject(path, extent=(-10, 10, -5, 5))
+    finally:
+        os.remove(path)
+    centers = np.random.uniform((-5, -2), (5, 2), size=(n_ops, 2))
+    def crop():
+        for _ in centers: im.crop((0.25, 0.75, 0.25, 0.75), update_points=False)
+    def crop_sky():
+        for x, y in centers: im.crop_sky((x - 1, x + 1, y - 1, y + 1), update_points=False)
+    def scroll():
+        for _ in centers: im.scroll_by((1e-3, 0))
+    def scroll_to_sky():
+        for x, y in centers: im.scroll_to_sky((x, y), width=2)
+    rows = [(name, timeit(f)/n_ops*1e6) for name, f in
+            [("crop", crop), ("crop_sky", crop_sky), ("scroll_by", scroll), ("scroll_to_sky", scroll_to_sky)]]
+    return _report("MyImageMobject crop / scroll (us per call)", rows, ("op", "time"))
+
+
+@register("find_deep", depths=(10, 100, 500))
+def bench_find_deep(depths=(10, 100, 500, 2000, 10**4)):
+    """time find_by_type down a chain of nested groups, where the recursive
+    version runs out of stack on deep trees (reported as nan)"""
+    from manimlib import Group, Mobject, Point
+    from vidlib.filter import find_by_type
+    rows = []
+    for depth in depths:
+        root = Point()
+        for _ in range(depth):
+            root = Group(Mobject(), root)
+        try:
+            t_rec = timeit(lambda: _find_by_type_recursive(root, Point, recursive=True), repeat=3)
+        except RecursionError:
+            t_rec = np.nan
+        t_iter = timeit(lambda: find_by_type(root, Point, recursive=True), repeat=3)
+        rows.append((depth, t_rec*1e3, t_iter*1e3))
+    return _report("find_by_type on deep trees (ms)", rows, ("depth", "recursive", "stack"))
+
+
+@register("slide_build", n_slides=3)
+def bench_slide_build(n_slides=10, n_lines=8):
+    """time building slides with a title and a bulleted list, and a
+    MultiLevelText, with the text cache cold and warm"""
+    from vidlib.slide import MultiLevelText, Slide
+    from vidlib.text import text_cache
+    lines = [f"point number {i}" for i in range(n_lines)]
+    text = "\n".join(("\t" if i % 2 else "") + line for i, line in enumerate(lines))
+    def build():
+        for i in range(n_slides):
+            slide = Slide()
+            slide.add(slide.title(f"Slide {i}"))
+            slide.add(slide.bulleted_list(*lines))
+            slide.add(MultiLevelText(text))
+    persist = text_cache.persist
+    text_cache.persist = False
+    try:
+        text_cache.clear()
+        t_cold = timeit(build, repeat=1)
+        t_warm = timeit(build, repeat=3)
+    finally:
+        text_cache.persist = persist
+    rows = [(n_slides, t_cold, t_warm, text_cache.stats()["hit_rate"])]
+    return _report("Slide and MultiLevelText construction (s)", rows,
+                   ("slides", "cold", "warm", "hit rate"), times=(1, 2))
+
+
+@register("to_pdf", n_slides=(3,))
+def bench_to_pdf(n_slides=(5, 20), n_stages=2):
+    """time exporting a synthetic deck of N slides with still pages to pdf,
+    without and with the render cache filled. Needs an OpenGL context."""
+    try:
+        import moderngl
+        moderngl.create_standalone_context().release()
+    except Exception as e:
+        raise SkipBenchmark(f"no OpenGL context: {e}")
+    from manimlib import Circle, FadeIn, RIGHT
+    from vidlib.slide import SlideShow
+
+    rows = []
+    with tempfile.TemporaryDirectory() as outdir:
+        for n in n_slides:
+            class Deck(SlideShow):
+                def construct(self):
+                    for i in range(n):
+                        slide = self.add_slide()
+                        slide.add(slide.title(f"Slide {i}"))
+                        for j in range(n_stages):
+                            circle = Circle().move_to(slide.get_center() + (j - 1)*RIGHT)
+                            slide.add_stage(FadeIn(circle))
+                    self.to_pdf(os.path.join(outdir, "deck.pdf"), still=True, cache=self.use_cache)
+
+            def export(cache):
+                deck = Deck(dev=False, preview=False,
+                            file_writer_config={"write_to_movie": False, "save_last_frame": False, "quiet": True})
+                deck.use_cache = cache
+                deck.run()
+            t_plain = timeit(lambda: export(False), repeat=1)
+            export(True)
+            t_cached = timeit(lambda: export(True), repeat=1)
+            rows.append((n, t_plain, t_cached))
+    return _report("SlideShow.to_pdf (s)", rows, ("slides", "render", "cached"))
+
+
+def run(names=None, quick=False):
+    """run benchmarks by name (all by default) and return their timings and
+    the reasons of those that were skipped"""
+    results, skipped = {}, {}
+    for name in names or list(BENCHMARKS):
+        kwargs = QUICK[name] if quick else {}
+        try:
+            results[name] = BENCHMARKS[name](**kwargs)
+        except (SkipBenchmark, ImportError) as e:
+            print(f"# {name}: skipped ({e})\n")
+            skipped[name] = str(e)
+    return results, skipped
+
+
+def compare(results, baseline, threshold=0.25, names=None):
+    """timings of the benchmarks in names (those in results by default) that
+    got slower than baseline by more than threshold, or that were measured in
+    the baseline but are now missing or failed, e.g. as the benchmark was
+    skipped. Returns (name, metric, baseline, now) tuples, now None if missing."""
+    regressions = []
+    for name in names if names is not None else results:
+        metrics = results.get(name, {})
+        for metric, base in baseline.get(name, {}).items():
+            if base is None: continue
+            value = metrics.get(metric)
+            if value is None or (base > 0 and value > base*(1 + threshold)):
+                regressions.append((name, metric, base, value))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m vidlib.bench", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("names", nargs="*", help="benchmarks to run, all by default")
+    parser.add_argument("--list", action="store_true", help="list the benchmarks and exit")
+    parser.add_argument("--quick", action="store_true", help="run with small sizes")
+    parser.add_argument("--output", help="save the results to this json file")
+    parser.add_argument("--baseline", help="json file of earlier results to compare with")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slowdown relative to the baseline (default 0.25)")
+    args = parser.parse_args(argv)
+    if args.list:
+        for name, func in BENCHMARKS.items():
+            print(f"{name:>16}  {func.__doc__.splitlines()[0]}")
+        return 0
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown: parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+
+    results, skipped = run(args.names, quick=args.quick)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "meta": {
+                    "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    "python": platform.python_version(),
+                    "numpy": np.__version__,
+                    "platform": platform.platform(),
+                    "quick": args.quick,
+                },
+                "results": results,
+                "skipped": skipped,
+            }, f, indent=1)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold, names=[*results, *skipped])
+        for name, metric, base, value in regressions:
+            if value is None:
+                print(f"REGRESSION {name} {metric}: {base:.4g} -> missing")
+            else:
+                print(f"REGRESSION {name} {metric}: {base:.4g} -> {value:.4g} ({value/base - 1:+.0%})")
+        if regressions: return 1
+        print(f"no regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
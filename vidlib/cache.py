@@ -0,0 +1,186 @@
+"""On-disk cache of rendered slide pages, keyed by the content of the slides"""
+import functools
+import glob
+import hashlib
+import os
+import types
+
+import numpy as np
+from PIL import Image
+from manimlib import Mobject, Scene
+
+from vidlib.constants import CACHE_DIR
+
+
+def fingerprint(*objs, origin=None):
+    """Hash mobjects, animations, stage functions and plain values into a hex
+    digest. Mobjects are hashed by the data and uniforms of their family, with
+    points taken relative to origin so that moving a whole slide keeps its
+    hash, and by the content of their texture files. Functions are hashed by
+    their code, defaults, closures and the globals they refer to, and other
+    objects by their attributes down to a few levels. Scenes, modules and
+    classes are hashed by name only, so editing a class a stage uses is not
+    seen. Memory addresses never enter the hash."""
+    h = hashlib.sha1()
+    seen = set()
+    for obj in objs:
+        _feed(h, obj, origin, seen, depth=0)
+    return h.hexdigest()
+
+
+@functools.lru_cache(maxsize=1024)
+def _file_digest(path, mtime, size):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def file_digest(path):
+    """sha1 of the content of a file, computed again only when its mtime or
+    size change, or None if it does not exist"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return _file_digest(os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+
+def _global_names(code):
+    """names of globals that code and the functions defined in it may use"""
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType): names |= _global_names(const)
+    return names
+
+
+def _feed(h, obj, origin, seen, depth):
+    if isinstance(obj, (str, int, float, bool, type(None))):
+        h.update(repr(obj).encode())
+        return
+    if isinstance(obj, np.ndarray):
+        h.update(str(obj.dtype).encode() + str(obj.shape).encode())
+        h.update(np.ascontiguousarray(obj).tobytes())
+        return
+    if isinstance(obj, (list, tuple, dict)):
+        # containers may contain themselves
+        if ("container", id(obj)) in seen:
+            h.update(b"<cycle>")
+            return
+        seen.add(("container", id(obj)))
+        if isinstance(obj, dict):
+            h.update(b"{")
+            for key in sorted(obj, key=repr):
+                _feed(h, key, origin, seen, depth)
+                _feed(h, obj[key], origin, seen, depth)
+            h.update(b"}")
+        else:
+            h.update(b"[")
+            for item in obj: _feed(h, item, origin, seen, depth)
+            h.update(b"]")
+        seen.discard(("container", id(obj)))
+        return
+    # the rest may reference each other, so only hash them once
+    if id(obj) in seen:
+        h.update(b"<seen>")
+        return
+    seen.add(id(obj))
+    h.update(type(obj).__qualname__.encode())
+    if isinstance(obj, Scene):
+        pass
+    elif isinstance(obj, (types.ModuleType, type)):
+        h.update(obj.__name__.encode())
+    elif isinstance(obj, Mobject):
+        for mob in obj.get_family():
+            h.update(type(mob).__qualname__.encode())
+            for key, value in sorted(mob.data.items()):
+                if key == "points" and origin is not None: value = value - origin
+                h.update(key.encode())
+                _feed(h, value, origin, seen, depth)
+            _feed(h, mob.uniforms, origin, seen, depth)
+            # by content, so that editing an image file changes the hash
+            _feed(h, {name: file_digest(path) for name, path in (mob.texture_paths or {}).items()},
+                  origin, seen, depth)
+    elif isinstance(obj, types.CodeType):
+        h.update(obj.co_code)
+        _feed(h, obj.co_names, origin, seen, depth)
+        _feed(h, obj.co_consts, origin, seen, depth)
+    elif isinstance(obj, (types.FunctionType, types.MethodType)):
+        func = getattr(obj, "__func__", obj)
+        _feed(h, func.__code__, origin, seen, depth)
+        _feed(h, func.__defaults__, origin, seen, depth)
+        _feed(h, [cell.cell_contents for cell in func.__closure__ or []
+                  if cell.cell_contents is not None], origin, seen, depth)
+        # helpers the function calls, so that editing them changes the hash
+        _feed(h, {name: func.__globals__[name] for name in _global_names(func.__code__)
+                  if name in func.__globals__}, origin, seen, depth)
+    elif hasattr(obj, "__dict__") and depth < 3:
+        _feed(h, vars(obj), origin, seen, depth + 1)
+
+
+def evict_files(pattern, max_size, keep=()):
+    """remove the least recently used (by mtime) files matching the glob
+    pattern until they take at most max_size bytes, except those in keep"""
+    files = []
+    for path in glob.glob(pattern):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        files.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in files)
+    for _, size, path in sorted(files):
+        if total <= max_size: break
+        if path in keep: continue
+        try:
+            os.remove(path)
+        except OSError:
+            # removed by another process meanwhile
+            pass
+        total -= size
+
+
+class RenderCache:
+    def __init__(self, cache_dir=None, max_size=2*1024**3):
+        """Rendered pages stored as png under cache_dir, one file per key.
+        Reading a page marks it as recently used, and evict removes the least
+        recently used pages once the cache is larger than max_size bytes.
+
+        Parameter
+        ---------
+        cache_dir : str
+            directory of the cache, by default CACHE_DIR/render
+        max_size : int
+            size limit in bytes
+        """
+        self.cache_dir = cache_dir or os.path.join(CACHE_DIR, "render")
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+    def get_path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.png")
+
+    def get(self, key):
+        """cached page of key as an RGB image, or None"""
+        path = self.get_path(key)
+        if not os.path.exists(path):
+            self.misses += 1
+            return None
+        self.hits += 1
+        os.utime(path)
+        with Image.open(path) as image:
+            return image.convert("RGB")
+
+    def put(self, key, image):
+        path = self.get_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # write then rename, so that parallel exports never see half a file
+        tmp = f"{path}.{os.getpid()}.tmp"
+        image.save(tmp, "PNG", compress_level=1)
+        os.replace(tmp, path)
+
+    def evict(self):
+        """remove the least recently used pages until the cache fits max_size"""
+        evict_files(os.path.join(self.cache_dir, "*", "*.png"), self.max_size)
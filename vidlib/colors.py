@@ -1,3 +1,6 @@
+import functools
+
+import numpy as np
 
 colorscheme = {
     'default': {
@@ -12,3 +15,141 @@ colorscheme = {
         'gray-light-1': "#81858d",
     }
 }
+
+
+@functools.lru_cache(maxsize=4096)
+def _to_rgba(color, scheme=None):
+    if isinstance(color, str):
+        if scheme is not None: color = colorscheme[scheme].get(color, color)
+        if color.startswith('#') and len(color) in (7, 9):
+            rgba = [int(color[i:i+2], 16)/255 for i in range(1, len(color), 2)]
+            return tuple(rgba) + (1.,)*(4 - len(rgba))
+        import matplotlib as mpl
+        return tuple(mpl.colors.to_rgba(color))
+    return tuple(float(v) for v in color) + (1.,)*(4 - len(color))
+
+
+def to_rgba(color, alpha=None, scheme=None):
+    """(4,) float rgba of a color: a hex string, a matplotlib color name or an
+    rgb(a) sequence. With scheme, e.g. 'default', names of that colorscheme
+    come first, so that 'purple' is the purple of the scheme rather than
+    matplotlib's. Conversions are cached."""
+    if hasattr(color, 'get_hex_l'): color = color.get_hex_l()  # colour.Color
+    # sequences are hashed as tuples by the cache
+    if not isinstance(color, str): color = tuple(float(v) for v in color)
+    rgba = np.array(_to_rgba(color, scheme))
+    if alpha is not None: rgba[3] = alpha
+    return rgba
+
+
+def to_rgba_array(colors, n=None, alpha=None, scheme=None):
+    """(N, 4) float rgba of one color, a list of colors or an (N, 3|4) float
+    or uint8 array. A single color is repeated n times. Each distinct color
+    is only converted once. See to_rgba for scheme."""
+    if isinstance(colors, np.ndarray) and colors.ndim == 2 and (colors.dtype.kind == 'f' or colors.dtype == np.uint8):
+        rgbas = np.ones((len(colors), 4))
+        rgbas[:, :colors.shape[1]] = colors/255 if colors.dtype == np.uint8 else colors
+    elif isinstance(colors, str) or hasattr(colors, 'get_hex_l') or \
+            (len(colors) in (3, 4) and all(isinstance(v, (int, float, np.number)) for v in colors)):
+        rgbas = np.tile(to_rgba(colors, scheme=scheme), (1 if n is None else n, 1))
+    else:
+        keys = [c if isinstance(c, str) else tuple(np.ravel(c)) for c in colors]
+        table = {key: to_rgba(key, scheme=scheme) for key in set(keys)}
+        rgbas = np.array([table[key] for key in keys]).reshape(-1, 4)
+    if alpha is not None: rgbas[:, 3] = alpha
+    return rgbas
+
+
+def to_hex(color, scheme=None):
+    """'#rrggbb' of a color, see to_rgba for scheme"""
+    r, g, b, _ = to_rgba(color, scheme=scheme)
+    return '#{:02x}{:02x}{:02x}'.format(*(int(round(v*255)) for v in (r, g, b)))
+
+
+class Colormap:
+    def __init__(self, colors, n=256, scheme=None):
+        """Lookup table of n rgba colors that maps values in [0, 1] to colors in
+        one numpy pass, indexed as matplotlib does so that results match its
+        colormaps. Bad values (nan) map to transparent.
+
+        Parameter
+        ---------
+        colors : str, list of colors or matplotlib colormap
+            a matplotlib colormap or its name, or colors spaced evenly from
+            0 to 1
+        n : int
+            number of entries
+        scheme : str
+            colorscheme whose names the colors may be, e.g. 'default'
+        """
+        if isinstance(colors, str) or callable(colors):
+            import matplotlib as mpl
+            cmap = mpl.colormaps[colors] if isinstance(colors, str) else colors
+            self.lut = np.asarray(cmap(np.linspace(0, 1, n)), dtype=float)
+        else:
+            stops = to_rgba_array(colors, scheme=scheme)
+            x = np.linspace(0, 1, len(stops))
+            t = np.linspace(0, 1, n)
+            self.lut = np.stack([np.interp(t, x, stops[:, i]) for i in range(4)], axis=1)
+        self.n = n
+        self.lut_bytes = (self.lut*255).astype(np.uint8)
+
+    def __call__(self, values, vmin=None, vmax=None, alpha=None, bytes=False):
+        """rgba of values, normalized to [0, 1] by vmin and vmax when given.
+        Returns (..., 4) floats, or uint8 if bytes."""
+        x = np.asarray(values, dtype=float)
+        if vmin is not None or vmax is not None:
+            vmin = np.nanmin(x) if vmin is None else vmin
+            vmax = np.nanmax(x) if vmax is None else vmax
+            x = (x - vmin)/((vmax - vmin) or 1)
+        bad = np.isnan(x)
+        index = np.clip((np.nan_to_num(x)*self.n).astype(np.int64), 0, self.n - 1)
+        rgbas = (self.lut_bytes if bytes else self.lut)[index]
+        if alpha is not None: rgbas[..., 3] = alpha*255 if bytes else alpha
+        if bad.any(): rgbas[bad] = 0
+        return rgbas
+
+
+@functools.lru_cache(maxsize=64)
+def _get_colormap(colors, n, scheme):
+    return Colormap(list(colors) if isinstance(colors, tuple) else colors, n, scheme)
+
+
+def get_colormap(colors, n=256, scheme=None):
+    """Colormap of colors, cached for names and lists of colors"""
+    if isinstance(colors, Colormap): return colors
+    if isinstance(colors, list): colors = tuple(colors)
+    if isinstance(colors, (str, tuple)): return _get_colormap(colors, n, scheme)
+    return Colormap(colors, n, scheme)
+
+
+def set_point_colors(mob, values, cmap='viridis', vmin=None, vmax=None, opacity=None):
+    """color the points of a DotCloud (or a point cloud based on it) by values,
+    writing its rgba buffer in place. vmin and vmax default to the range of
+    values."""
+    if vmin is None: vmin = np.nanmin(values)
+    if vmax is None: vmax = np.nanmax(values)
+    rgbas = get_colormap(cmap)(values, vmin=vmin, vmax=vmax, alpha=opacity)
+    if mob.data["rgbas"].shape == rgbas.shape:
+        mob.data["rgbas"][:] = rgbas
+    else:
+        mob.data["rgbas"] = rgbas
+    return mob
+
+
+def set_stroke_colors(mob, values, cmap='viridis', vmin=None, vmax=None, opacity=None):
+    """color the stroke of a VMobject by values, one per point or one per
+    curve, writing its stroke_rgba buffer in place. vmin and vmax default to
+    the range of values."""
+    values = np.asarray(values, dtype=float)
+    n_points = mob.get_num_points()
+    if len(values) != n_points:
+        values = np.repeat(values, n_points//len(values))
+    if vmin is None: vmin = np.nanmin(values)
+    if vmax is None: vmax = np.nanmax(values)
+    rgbas = get_colormap(cmap)(values, vmin=vmin, vmax=vmax, alpha=opacity)
+    if mob.data["stroke_rgba"].shape == rgbas.shape:
+        mob.data["stroke_rgba"][:] = rgbas
+    else:
+        mob.data["stroke_rgba"] = rgbas
+    return mob
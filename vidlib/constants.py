@@ -1,5 +1,10 @@
+import os
+
 from manimlib.constants import *
 
 # aliases
 FW = FRAME_WIDTH
-FH = FRAME_HEIGHT
\ No newline at end of file
+FH = FRAME_HEIGHT
+
+# where vidlib keeps its on-disk caches
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "vidlib")
@@ -3,30 +3,134 @@ import numpy as np
 _search_fields = ['submobjects', 'mobjects']
 
 def find_by_type(mob, typ, recursive=False):
+    """mobjects of type typ in mob, which may be a list, in depth-first order.
+    With recursive, submobjects (and mobjects of a scene) are searched too,
+    but not below a match. This walks an explicit stack, so deep trees do not
+    hit the recursion limit."""
     res = []
-    if isinstance(mob, typ):
-        return [mob]
-    elif isinstance(mob, list):
-        for m in mob:
-            res += find_by_type(m, typ, recursive=recursive)
-        return res
-    elif recursive:
-        mobs = [getattr(mob, field) for field in _search_fields if hasattr(mob, field)]
-        if len(mobs) == 0: return []
-        else:
-            mobs = [mob for sublist in mobs for mob in sublist]  # flatten
-            return find_by_type(mobs, typ, recursive=recursive)
-    else: return res
+    stack = [mob]
+    while stack:
+        mob = stack.pop()
+        if isinstance(mob, typ):
+            res.append(mob)
+        elif isinstance(mob, list):
+            stack.extend(reversed(mob))
+        elif recursive:
+            children = [m for field in _search_fields if hasattr(mob, field)
+                        for m in getattr(mob, field)]
+            stack.extend(reversed(children))
+    return res
+
+def _field_matches(mob, field, value):
+    return hasattr(mob, field) and \
+        (getattr(mob, field) == value or value in getattr(mob, field))
 
 def find_by_field(mobs, field, value):
+    """mobjects in mobs, which may be a (nested) list, whose field equals or
+    contains value"""
     res = []
-    if isinstance(mobs, list):
+    stack = [mobs]
+    while stack:
+        mob = stack.pop()
+        if isinstance(mob, list):
+            stack.extend(reversed(mob))
+        elif _field_matches(mob, field, value):
+            res.append(mob)
+    return res
+
+
+class MobjectIndex:
+    def __init__(self, fields=()):
+        """Index of mobjects and their families by type and by field value,
+        kept up to date through add and remove, so that queries take time in
+        the size of the result instead of the scene. Fields are indexed
+        when first queried unless given here. Field values are read when a
+        mobject is added: call update after changing them.
+
+        Parameter
+        ---------
+        fields : list of str
+            fields to index from the start
+        """
+        # indexed mobjects in the order they were added, as an ordered set
+        self.mobjects = {}
+        self.types = {}
+        self.fields = {field: {} for field in fields}
+
+    def __len__(self):
+        return len(self.mobjects)
+
+    def __contains__(self, mob):
+        return mob in self.mobjects
+
+    def _iter_family(self, mobs):
         for mob in mobs:
-            res += find_by_field(mob, field, value)
+            if isinstance(mob, list):
+                yield from self._iter_family(mob)
+            else:
+                yield from mob.get_family()
+
+    def _index_field(self, field, mob):
+        if not hasattr(mob, field): return
+        try:
+            self.fields[field].setdefault(getattr(mob, field), {})[mob] = None
+        except TypeError:
+            # unhashable values can only be found by find_by_field
+            pass
+
+    def _unindex_field(self, field, mob):
+        if not hasattr(mob, field): return
+        try:
+            mobs = self.fields[field].get(getattr(mob, field), {})
+        except TypeError:
+            return
+        mobs.pop(mob, None)
+
+    def add(self, *mobs):
+        """index mobs and their families, adding again is a no-op"""
+        for mob in self._iter_family(mobs):
+            if mob in self.mobjects: continue
+            self.mobjects[mob] = None
+            self.types.setdefault(type(mob), {})[mob] = None
+            for field in self.fields:
+                self._index_field(field, mob)
+
+    def remove(self, *mobs):
+        """drop mobs and their families from the index"""
+        for mob in self._iter_family(mobs):
+            if mob not in self.mobjects: continue
+            del self.mobjects[mob]
+            self.types[type(mob)].pop(mob, None)
+            for field in self.fields:
+                self._unindex_field(field, mob)
+
+    def update(self, *mobs):
+        """index the current field values of mobs and their families. Values
+        they had before are found by scanning the field buckets."""
+        family = [mob for mob in self._iter_family(mobs) if mob in self.mobjects]
+        for field, values in self.fields.items():
+            for mobs_with_value in values.values():
+                for mob in family:
+                    mobs_with_value.pop(mob, None)
+            for mob in family:
+                self._index_field(field, mob)
+
+    def find_by_type(self, typ):
+        """indexed mobjects of type typ (or a subclass), grouped by type in the
+        order they were added"""
+        res = []
+        for t, mobs in self.types.items():
+            if issubclass(t, typ): res.extend(mobs)
         return res
-    else:
-        if hasattr(mobs, field) and \
-           (getattr(mobs, field) == value or value in getattr(mobs, field)):
-            return [mobs]
-        else:
-            return []
+
+    def find_by_field(self, field, value):
+        """indexed mobjects whose field equals value"""
+        if field not in self.fields:
+            self.fields[field] = {}
+            for mob in self.mobjects:
+                self._index_field(field, mob)
+        try:
+            return list(self.fields[field].get(value, ()))
+        except TypeError:
+            return [mob for mob in self.mobjects
+                    if hasattr(mob, field) and getattr(mob, field) == value]
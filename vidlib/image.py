@@ -1,5 +1,28 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import weakref
+from collections import OrderedDict
+
 from manimlib import *
 
+from vidlib.cache import evict_files
+from vidlib.colors import get_colormap
+from vidlib.constants import CACHE_DIR
+
+
+# on-disk size limit of the textures written by MyImageMobject.from_array
+TEXTURE_CACHE_SIZE = 1024**3
+
+
+def _as_input(res, coord):
+    """return a single coordinate as a tuple, as the scalar api always did,
+    and leave arrays of coordinates as arrays"""
+    if res.ndim == 1 and not isinstance(coord, np.ndarray): return tuple(res)
+    return res
+
 
 class MyImageMobject(ImageMobject):
     def __init__(self, filename, extent=None, **kwargs):
@@ -16,6 +39,117 @@ class MyImageMobject(ImageMobject):
         # if extent is None: self.extent = self.data['im_coords']
         self.extent = extent
 
+    @classmethod
+    def from_array(cls, data, extent=None, box=(0, 1, 0, 1), cmap='gray', stretch='linear',
+                   vmin=None, vmax=None, cache_dir=None, **kwargs):
+        """Make an image from an array of values, such as a memory-mapped sky map.
+        Only the pixels inside box are read, stretched and colored, so a crop of
+        a large map does not load the rest of it.
+
+        Parameter
+        ---------
+        data : array
+            2d array of values, or an (h, w, 3|4) uint8 array which is used as is
+        extent : tuple of float
+            actual bounds of the full array, i.e., (x_min, x_max, y_min, y_max)
+        box : tuple of float
+            region to load in image coordinate (x_min, x_max, y_min, y_max), where
+            y goes from the first row (0) to the last row (1) of data
+        cmap : str or matplotlib colormap
+            colormap applied to 2d data
+        stretch : str
+            one of 'linear', 'log' or 'asinh'
+        vmin, vmax : float
+            values mapped to the ends of the colormap, default to the range
+            of the loaded region
+        cache_dir : str
+            directory where the colored region is saved as a texture. The
+            least recently used textures there are removed beyond
+            TEXTURE_CACHE_SIZE bytes.
+        """
+        x0, x1, y0, y1 = _pixel_box(box, data.shape)
+        region = np.asarray(data[y0:y1, x0:x1])
+        if region.ndim == 2:
+            region = _colorize(region, cmap=cmap, stretch=stretch, vmin=vmin, vmax=vmax)
+        key = hashlib.sha1(np.ascontiguousarray(region).tobytes()).hexdigest()[:16]
+        cache_dir = cache_dir or os.path.join(CACHE_DIR, "textures")
+        path = os.path.join(cache_dir, key + ".png")
+        if os.path.exists(path):
+            os.utime(path)
+        else:
+            _write_texture(region, path)
+            evict_files(os.path.join(cache_dir, "*.png"), TEXTURE_CACHE_SIZE, keep=(path,))
+        if extent is not None:
+            h, w = data.shape[:2]
+            x_min, x_max, y_min, y_max = extent
+            extent = (
+                x_min + x0/w*(x_max - x_min), x_min + x1/w*(x_max - x_min),
+                y_min + y0/h*(y_max - y_min), y_min + y1/h*(y_max - y_min),
+            )
+        return cls(path, extent=extent, **kwargs)
+
+    @classmethod
+    def from_npy_memmap(cls, filename, shape=None, dtype=np.float32, offset=0, extent=None, **kwargs):
+        """Make an image from a .npy file or a raw binary map without reading it into
+        memory. If extent is not given, it is read from a json file next to the map
+        (map.json or map.npy.json) with an "extent" entry. Other arguments are passed
+        to from_array.
+
+        Parameter
+        ---------
+        filename : str
+            path to a .npy file or a raw binary file
+        shape : tuple of int
+            (h, w) of a raw binary file
+        dtype : numpy dtype
+            data type of a raw binary file
+        offset : int
+            header size in bytes of a raw binary file
+        extent : tuple of float
+            actual bounds of the map, i.e., (x_min, x_max, y_min, y_max)
+        """
+        if filename.endswith(".npy"):
+            data = np.load(filename, mmap_mode='r')
+        else:
+            if shape is None: raise ValueError("shape is needed to read a raw map")
+            data = np.memmap(filename, dtype=dtype, mode='r', shape=shape, offset=offset)
+        if extent is None:
+            for meta in [os.path.splitext(filename)[0] + ".json", filename + ".json"]:
+                if os.path.exists(meta):
+                    with open(meta) as f:
+                        extent = json.load(f).get("extent")
+                    break
+        return cls.from_array(data, extent=extent, **kwargs)
+
+    @classmethod
+    def from_fits(cls, filename, hdu=0, **kwargs):
+        """Make an image from a FITS map without reading it into memory, with the
+        extent taken from the linear WCS keywords of its header (CRVAL, CRPIX and
+        CDELT or CD). The map is flipped so that the last row is on top, as FITS
+        images are stored bottom-up. Other arguments are passed to from_array.
+        This needs astropy.
+
+        Parameter
+        ---------
+        filename : str
+            path to the FITS file
+        hdu : int
+            index of the HDU that holds the map
+        """
+        from astropy.io import fits
+        with fits.open(filename, memmap=True) as hdul:
+            header, data = hdul[hdu].header, hdul[hdu].data
+            if 'extent' not in kwargs:
+                # pixel i (1-based) is centered at CRVAL + (i - CRPIX)*CDELT
+                edges = []
+                for axis in (1, 2):
+                    delt = header.get(f'CDELT{axis}', header.get(f'CD{axis}_{axis}', 1))
+                    n, ref, val = header[f'NAXIS{axis}'], header.get(f'CRPIX{axis}', 1), header.get(f'CRVAL{axis}', 0)
+                    edges.append((val + (0.5 - ref)*delt, val + (n + 0.5 - ref)*delt))
+                (x_lo, x_hi), (y_lo, y_hi) = edges
+                kwargs['extent'] = (x_lo, x_hi, y_hi, y_lo)
+            return cls.from_array(data[::-1], **kwargs)
+
     def crop(self, box, update_points=True):
         """Crop image to box.
         
@@ -50,8 +184,9 @@ class MyImageMobject(ImageMobject):
             (x_min, x_max, y_min, y_max)
         """
         (x_min, x_max, y_min, y_max) = skybox
-        (x_min, y_min) = self.sky2im((x_min, y_min))
-        (x_max, y_max) = self.sky2im((x_max, y_max))
+        ((x_min, y_min), (x_max, y_max)) = self.sky2im(np.array([
+            (x_min, y_min), (x_max, y_max)
+        ]))
         self.crop([x_min, x_max, y_min, y_max], update_points=update_points)
 
     def scroll_by(self, displacement):
@@ -87,13 +222,12 @@ class MyImageMobject(ImageMobject):
             height of the box in degrees 
         """
         if height is None: height = width
-        im_coords = np.array([
-           self.sky2im([skypos[0] - width/2, skypos[1] - height/2]),
-           self.sky2im([skypos[0] - width/2, skypos[1] + height/2]),
-           self.sky2im([skypos[0] + width/2, skypos[1] - height/2]),
-           self.sky2im([skypos[0] + width/2, skypos[1] + height/2]),
-        ])
-        self.data['im_coords'] = im_coords
+        self.data['im_coords'] = self.sky2im(np.array([
+           (skypos[0] - width/2, skypos[1] - height/2),
+           (skypos[0] - width/2, skypos[1] + height/2),
+           (skypos[0] + width/2, skypos[1] - height/2),
+           (skypos[0] + width/2, skypos[1] + height/2),
+        ]))
 
     def scroll_sky(self, pos):
         """scroll image without changing its size.
@@ -112,59 +246,63 @@ class MyImageMobject(ImageMobject):
         
         Parameter
         ---------
-        coord : tuple of float (x, y)
+        coord : tuple of float (x, y), or array of shape (N, 2)
         
         Return
         ------
-        tuple of float
+        tuple of float, or array of shape (N, 2) if an array of coordinates is given
 
         """
         if self.extent is None: return coord
-        else:
-            return (
-                self.extent[0] + coord[0]*(self.extent[1] - self.extent[0]),
-                self.extent[2] + coord[1]*(self.extent[3] - self.extent[2]),
-            )
+        c = np.asarray(coord, dtype=float)
+        x_min, x_max, y_min, y_max = self.extent
+        res = np.array([x_min, y_min]) + c[..., :2]*np.array([x_max - x_min, y_max - y_min])
+        return _as_input(res, coord)
 
     def sky2im(self, coord):
         """convert a physical coordinate to image coordinate.
         
         Parameter
         ---------
-        coord : tuple of float (x, y)
+        coord : tuple of float (x, y), or array of shape (N, 2)
         
         Return
         ------
-        tuple of float
+        tuple of float, or array of shape (N, 2) if an array of coordinates is given
 
         """
         if self.extent is None: return coord
-        else:
-            return (
-                (coord[0] - self.extent[0])/(self.extent[1] - self.extent[0]),
-                (coord[1] - self.extent[2])/(self.extent[3] - self.extent[2]),
-            )
+        c = np.asarray(coord, dtype=float)
+        x_min, x_max, y_min, y_max = self.extent
+        res = (c[..., :2] - np.array([x_min, y_min]))/np.array([x_max - x_min, y_max - y_min])
+        return _as_input(res, coord)
         
     def im2p(self, coord):
-        """convert an image coordinate to point"""
-        # self.pointsself.get_width()*coord[0]
+        """convert an image coordinate (or an (N, 2) array of them) to point(s)"""
+        # bounding box and size are looked up once per call, not per coordinate
         bbox = self.get_bounding_box()
+        size = bbox[2] - bbox[0]
+        c = np.asarray(coord, dtype=float)
         # based on the BL corner, 2D
-        return bbox[0] + np.array([self.get_width()*coord[0], self.get_height()*coord[1], 0])
+        points = np.zeros((*c.shape[:-1], 3))
+        points[..., :2] = c[..., :2]*size[:2]
+        points += bbox[0]
+        return points
 
     def sky2p(self, coord):
-        """convert a physical coordinate to point"""
+        """convert a physical coordinate (or an (N, 2) array of them) to point(s)"""
         return self.im2p(self.sky2im(coord))
 
     def p2im(self, point):
-        """convert a point to image coordinate"""
+        """convert a point (or an (N, 2) / (N, 3) array of them) to image coordinate(s)"""
         bbox = self.get_bounding_box()
+        size = bbox[2] - bbox[0]
         # based on the BL corner, 2D
-        pt = point[:2]
-        return np.abs(pt - bbox[0][:2])/np.array([self.get_width(), self.get_height()])
+        pt = np.asarray(point, dtype=float)[..., :2]
+        return np.abs(pt - bbox[0][:2])/size[:2]
 
     def p2sky(self, point):
-        """convert a point to physical coordinate"""
+        """convert a point (or an (N, 2) / (N, 3) array of them) to physical coordinate(s)"""
         return self.im2sky(self.p2im(point))
 
     def get_width_sky(self):
@@ -194,3 +332,412 @@ class MyImageMobject(ImageMobject):
         self.scale(ratio, about_point=self.get_center())  # note that this assumes aspect ratio is maintained
         if move: self.move_to(other.sky2p(self.p2sky(self.get_center())))
 
+
+
+class SkyPanZoom(Animation):
+    CONFIG = {
+        # the easing is already part of the trajectory
+        "rate_func": linear,
+        "frame_rate": None,
+        "aspect": 1,
+        "times": None,
+    }
+    def __init__(self, image, keyframes, **kwargs):
+        """Fly over a MyImageMobject through a list of sky keyframes. Position and
+        log-width follow a clamped cubic spline through the keyframes, so the
+        motion starts and ends at rest and zooming feels uniform. By default the
+        spline is evaluated at each rendered frame, whatever the frame rate. With
+        frame_rate, the im_coords of every frame are computed once when the
+        animation is made, and frames in between are interpolated.
+
+        Parameter
+        ---------
+        image : MyImageMobject
+            image with an extent
+        keyframes : list of tuple of float
+            [(ra, dec, width), ...] in sky coordinate, visited in order
+        frame_rate : float
+            frames per second to precompute, e.g. scene.camera.frame_rate
+        aspect : float
+            height / width of the box, as in scroll_to_sky
+        times : list of float
+            time of each keyframe as a fraction of run_time, default to even spacing
+        """
+        super().__init__(image, **kwargs)
+        self.path = self.get_path(keyframes)
+        self.trajectory = None
+        if self.frame_rate is not None:
+            self.trajectory = self.get_trajectory(keyframes)
+
+    def get_path(self, keyframes):
+        """function of an array of t in [0, 1] to (ra, dec, log-width) rows"""
+        from scipy import interpolate as sinterp
+        keyframes = np.asarray(keyframes, dtype=float)
+        path = np.column_stack([keyframes[:, :2], np.log(keyframes[:, 2])])
+        if len(path) == 1:
+            return lambda t: np.repeat(path, len(t), axis=0)
+        times = np.linspace(0, 1, len(path)) if self.times is None else np.asarray(self.times)
+        return sinterp.CubicSpline(times, path, bc_type='clamped')
+
+    def get_im_coords(self, t):
+        """im_coords at an array of t in [0, 1], of shape (len(t), 4, 2)"""
+        path = self.path(t)
+        (ra, dec, width) = path[:, 0], path[:, 1], np.exp(path[:, 2])
+        height = width*self.aspect
+        corners = np.stack([
+            (ra - width/2, dec - height/2),
+            (ra - width/2, dec + height/2),
+            (ra + width/2, dec - height/2),
+            (ra + width/2, dec + height/2),
+        ], axis=1).transpose(2, 1, 0)
+        return self.mobject.sky2im(corners.reshape(-1, 2)).reshape(len(t), 4, 2)
+
+    def get_trajectory(self, keyframes):
+        """im_coords of every frame at frame_rate, as an array of shape (frames, 4, 2)"""
+        self.path = self.get_path(keyframes)
+        n = max(int(round(self.run_time*self.frame_rate)), 1)
+        return self.get_im_coords(np.linspace(0, 1, n + 1))
+
+    def begin(self):
+        # im_coords starts as an integer array, make it writable in place
+        self.mobject.data['im_coords'] = self.mobject.data['im_coords'].astype(float)
+        super().begin()
+
+    def interpolate_mobject(self, alpha):
+        alpha = np.clip(alpha, 0, 1)
+        if self.trajectory is None:
+            self.mobject.data['im_coords'][:] = self.get_im_coords(np.array([alpha]))[0]
+            return
+        # between the two precomputed frames around alpha
+        x = alpha*(len(self.trajectory) - 1)
+        i = min(int(x), len(self.trajectory) - 2)
+        f = x - i
+        coords = self.trajectory[i] if f == 0 else (1 - f)*self.trajectory[i] + f*self.trajectory[i + 1]
+        self.mobject.data['im_coords'][:] = coords
+
+
+def _write_texture(array, path):
+    """save an (h, w, 3|4) uint8 array as an image file that manim can load as a texture"""
+    from PIL import Image
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        Image.fromarray(np.ascontiguousarray(array)).save(path, compress_level=1)
+    return path
+
+
+def _pixel_box(box, shape):
+    """integer pixel bounds (x0, x1, y0, y1) covering box, given in image coordinate,
+    on an image of shape (h, w)"""
+    h, w = shape[:2]
+    xs = np.clip(np.sort(box[:2])*w, 0, w)
+    ys = np.clip(np.sort(box[2:])*h, 0, h)
+    x0, y0 = int(np.floor(xs[0])), int(np.floor(ys[0]))
+    x1, y1 = max(int(np.ceil(xs[1])), x0 + 1), max(int(np.ceil(ys[1])), y0 + 1)
+    return min(x0, w - 1), min(x1, w), min(y0, h - 1), min(y1, h)
+
+
+# stretches map values normalized to [0, 1] back onto [0, 1]
+STRETCHES = {
+    'linear': lambda x: x,
+    'log': lambda x: np.log10(1 + 1000*x)/3,
+    'asinh': lambda x: np.arcsinh(10*x)/np.arcsinh(10),
+}
+
+
+def _colorize(data, cmap='gray', stretch='linear', vmin=None, vmax=None):
+    """turn a 2d array of values into an (h, w, 4) uint8 image"""
+    data = np.asarray(data, dtype=np.float32)
+    if vmin is None: vmin = np.nanmin(data)
+    if vmax is None: vmax = np.nanmax(data)
+    x = np.clip((data - vmin)/((vmax - vmin) or 1), 0, 1)
+    if stretch not in STRETCHES: raise ValueError(f"Unknown stretch: {stretch}")
+    return get_colormap(cmap)(STRETCHES[stretch](x), bytes=True)
+
+
+def _downsample(array):
+    """halve an (h, w, c) image by averaging 2x2 blocks"""
+    h, w = array.shape[0]//2*2, array.shape[1]//2*2
+    blocks = array[:h, :w].reshape(h//2, 2, w//2, 2, -1).astype(np.float32)
+    return blocks.mean(axis=(1, 3)).round().astype(array.dtype)
+
+
+class ImagePyramid:
+    def __init__(self, source, tile_size=1024, cache_dir=None, max_tiles_in_memory=64):
+        """Downsampled copies of a large image, cut into tiles and cached on disk.
+        Level 0 is the full resolution and every next level halves the size, until
+        the whole image fits in one tile. The levels are built once per source and
+        reused by later runs.
+
+        Parameter
+        ---------
+        source : str or array
+            path to an image file, or an (h, w, 3|4) uint8 array
+        tile_size : int
+            width and height of a tile in pixels
+        cache_dir : str
+            directory of the tile cache, default to CACHE_DIR/pyramid
+        max_tiles_in_memory : int
+            number of recently used tiles kept in memory
+        """
+        self.tile_size = tile_size
+        self.max_tiles_in_memory = max_tiles_in_memory
+        self._tiles = OrderedDict()
+        cache_dir = cache_dir or os.path.join(CACHE_DIR, "pyramid")
+        self.path = os.path.join(cache_dir, self._source_key(source))
+        meta = os.path.join(self.path, "levels.json")
+        if not os.path.exists(meta): self.build(source)
+        with open(meta) as f:
+            self.levels = [tuple(shape) for shape in json.load(f)]
+
+    def _source_key(self, source):
+        h = hashlib.sha1(str(self.tile_size).encode())
+        if isinstance(source, str):
+            source = os.path.abspath(source)
+            stat = os.stat(source)
+            h.update(f"{source}:{stat.st_size}:{stat.st_mtime}".encode())
+        else:
+            source = np.ascontiguousarray(source)
+            h.update(f"{source.shape}:{source.dtype}".encode())
+            h.update(memoryview(source).cast("B"))
+        return h.hexdigest()[:16]
+
+    def build(self, source):
+        """cut all levels of source into tiles on disk"""
+        if isinstance(source, str):
+            from PIL import Image
+            Image.MAX_IMAGE_PIXELS = None
+            source = np.asarray(Image.open(source).convert("RGBA"))
+        level, shapes = np.asarray(source), []
+        while True:
+            lid = len(shapes)
+            shapes.append(level.shape[:2])
+            for ty in range(0, level.shape[0], self.tile_size):
+                for tx in range(0, level.shape[1], self.tile_size):
+                    path = self._tile_path(lid, ty//self.tile_size, tx//self.tile_size)
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    np.save(path, level[ty:ty+self.tile_size, tx:tx+self.tile_size])
+            if max(level.shape[:2]) <= self.tile_size: break
+            level = _downsample(level)
+        # written last so that an interrupted build is redone next time
+        with open(os.path.join(self.path, "levels.json"), "w") as f:
+            json.dump(shapes, f)
+
+    def _tile_path(self, level, ty, tx):
+        return os.path.join(self.path, f"L{level}", f"{ty}_{tx}.npy")
+
+    def get_tile(self, level, ty, tx):
+        """load a tile, keeping the most recently used ones in memory"""
+        key = (level, ty, tx)
+        if key in self._tiles:
+            self._tiles.move_to_end(key)
+        else:
+            self._tiles[key] = np.load(self._tile_path(level, ty, tx))
+            if len(self._tiles) > self.max_tiles_in_memory:
+                self._tiles.popitem(last=False)
+        return self._tiles[key]
+
+    def choose_level(self, box, screen_pixels):
+        """the coarsest level that still has at least screen_pixels pixels across box
+
+        Parameter
+        ---------
+        box : tuple of float
+            (x_min, x_max, y_min, y_max) in image coordinate
+        screen_pixels : float
+            width of box on screen in pixels
+        """
+        src_pixels = abs(box[1] - box[0])*self.levels[0][1]
+        level = int(np.floor(np.log2(max(src_pixels/max(screen_pixels, 1), 1))))
+        return min(level, len(self.levels) - 1)
+
+    def get_pixel_box(self, box, level):
+        """integer pixel bounds (x0, x1, y0, y1) of box on a level"""
+        return _pixel_box(box, self.levels[level])
+
+    def read(self, box, level):
+        """assemble the pixels of box on a level from the tiles that cover it"""
+        x0, x1, y0, y1 = self.get_pixel_box(box, level)
+        ts = self.tile_size
+        out = None
+        for ty in range(y0//ts, (y1 - 1)//ts + 1):
+            for tx in range(x0//ts, (x1 - 1)//ts + 1):
+                tile = self.get_tile(level, ty, tx)
+                if out is None:
+                    out = np.zeros((y1 - y0, x1 - x0) + tile.shape[2:], dtype=tile.dtype)
+                # overlap of the tile and the box, in level pixels
+                oy0, oy1 = max(y0, ty*ts), min(y1, ty*ts + tile.shape[0])
+                ox0, ox1 = max(x0, tx*ts), min(x1, tx*ts + tile.shape[1])
+                out[oy0-y0:oy1-y0, ox0-x0:ox1-x0] = tile[oy0-ty*ts:oy1-ty*ts, ox0-tx*ts:ox1-tx*ts]
+        # a reversed box shows the image flipped, as MyImageMobject.crop does
+        if box[0] > box[1]: out = out[:, ::-1]
+        if box[2] > box[3]: out = out[::-1]
+        return out
+
+
+class _ViewDir:
+    def __init__(self):
+        """temporary directory of the textures of a TiledImageMobject, shared
+        with its copies and removed when none of them is left"""
+        self.path = tempfile.mkdtemp(prefix="vidlib_views_")
+        self.count = 0
+        weakref.finalize(self, shutil.rmtree, self.path, True)
+
+    def new_path(self):
+        self.count += 1
+        return os.path.join(self.path, f"{self.count}.png")
+
+
+class _TileView(ImageMobject):
+    def __init__(self, path, pyramid, window, level, **kwargs):
+        """texture of a window of a pyramid, written again if its file was
+        dropped while a copy, e.g. a saved state, still shows it"""
+        self.pyramid, self.window, self.level = pyramid, window, level
+        super().__init__(path, **kwargs)
+
+    def get_shader_wrapper(self):
+        if not os.path.exists(self.path):
+            _write_texture(self.pyramid.read(self.window, self.level), self.path)
+        return super().get_shader_wrapper()
+
+
+class TiledImageMobject(Group):
+    def __init__(self, source, extent=None, height=4, tile_size=1024, cache_dir=None,
+                 screen_pixels=None, max_views=8, camera=None, **kwargs):
+        """Image backed by an ImagePyramid. Only the tiles of the level that match the
+        current window and its size on screen are loaded and uploaded, so the cost
+        depends on the viewport rather than on the size of the source. The mobject
+        keeps its place and size on screen while the window moves over the image,
+        similar to MyImageMobject.scroll_to_sky.
+
+        Parameter
+        ---------
+        source : str or array
+            path to an image file, or an (h, w, 3|4) uint8 array
+        extent : tuple of float
+            actual bounds of the image, i.e., (x_min, x_max, y_min, y_max)
+        height : float
+            height of the mobject
+        tile_size : int
+            size of the pyramid tiles in pixels
+        cache_dir : str
+            directory of the tile cache
+        screen_pixels : float
+            width of the mobject on screen in pixels, default to estimating it
+            from the default camera resolution
+        max_views : int
+            number of recent windows whose textures are kept, older ones are
+            deleted from disk
+        camera : Camera
+            camera that renders the mobject, e.g. scene.camera, whose copies of
+            the deleted textures are released too. Without it the camera keeps
+            the texture of every window shown.
+        """
+        super().__init__()
+        self.pyramid = ImagePyramid(source, tile_size=tile_size, cache_dir=cache_dir)
+        self.extent = extent
+        self.screen_pixels = screen_pixels
+        self.image_kwargs = kwargs
+        self.window = (0, 1, 0, 1)
+        self.max_views = max_views
+        self.camera = camera
+        # texture paths of the recent views, least recently shown first
+        self.views = OrderedDict()
+        self.view_dir = _ViewDir()
+        # start from the coarsest level, then load the one that matches the size
+        self.refresh()
+        self.view.set_height(height)
+        self.refresh()
+
+    @property
+    def view(self):
+        return self.submobjects[0] if self.submobjects else None
+
+    def get_screen_pixels(self):
+        if self.screen_pixels is not None: return self.screen_pixels
+        return self.get_width()/FRAME_WIDTH*DEFAULT_PIXEL_WIDTH
+
+    def refresh(self):
+        """load the tiles for the current window and swap in the new texture"""
+        level = self.pyramid.choose_level(self.window, self.get_screen_pixels() if self.view else 0)
+        key = self.pyramid.get_pixel_box(self.window, level)
+        flip = (self.window[0] > self.window[1], self.window[2] > self.window[3])
+        key = (level, key, flip)
+        if key in self.views:
+            self.views.move_to_end(key)
+            path = self.views[key]
+        else:
+            # each view gets its own file as the camera caches textures by path
+            path = self.view_dir.new_path()
+            _write_texture(self.pyramid.read(self.window, level), path)
+            self.views[key] = path
+            while len(self.views) > self.max_views:
+                self.release_view(self.views.popitem(last=False)[1])
+        view = _TileView(path, self.pyramid, self.window, level, **self.image_kwargs)
+        if self.view is not None:
+            view.replace(self.view, stretch=True)
+        self.set_submobjects([view])
+        return self
+
+    def release_view(self, path):
+        """delete the texture of a view from disk and from the camera"""
+        if os.path.exists(path): os.remove(path)
+        if hasattr(self.camera, "release_texture"): self.camera.release_texture(path)
+
+    def crop(self, box):
+        """show box of the image.
+
+        Parameter
+        ---------
+        box : tuple of float
+            (x_min, x_max, y_min, y_max) in image coordinate
+        """
+        self.window = tuple(box)
+        return self.refresh()
+
+    def crop_sky(self, skybox):
+        """show skybox of the image.
+
+        Parameter
+        ---------
+        skybox : tuple of float
+            (x_min, x_max, y_min, y_max)
+        """
+        (x_min, x_max, y_min, y_max) = skybox
+        ((x_min, y_min), (x_max, y_max)) = self.sky2im(np.array([
+            (x_min, y_min), (x_max, y_max)
+        ]))
+        return self.crop((x_min, x_max, y_min, y_max))
+
+    def scroll_by(self, displacement):
+        """move the window by a displacement in image coordinate.
+
+        Parameter
+        ---------
+        displacement : tuple of float
+            (x, y)
+        """
+        dx, dy = displacement
+        x_min, x_max, y_min, y_max = self.window
+        return self.crop((x_min + dx, x_max + dx, y_min + dy, y_max + dy))
+
+    def scroll_to_sky(self, skypos, width=2, height=None):
+        """move the window to a sky position, placing the position in the center.
+        
+        Parameter
+        ---------
+        skypos : tuple of float in degrees
+            (x, y)
+        width : float
+            width of the box in degrees
+        height : float
+            height of the box in degrees 
+        """
+        if height is None: height = width
+        return self.crop_sky((skypos[0] - width/2, skypos[0] + width/2,
+                              skypos[1] - height/2, skypos[1] + height/2))
+
+    # coordinate conversions over the full image are the same as MyImageMobject
+    im2sky = MyImageMobject.im2sky
+    sky2im = MyImageMobject.sky2im
+    get_width_sky = MyImageMobject.get_width_sky
+    get_height_sky = MyImageMobject.get_height_sky
@@ -0,0 +1,85 @@
+"""A minimal pdf writer that writes one image per page as the pages come"""
+import io
+import zlib
+
+
+class PdfWriter:
+    def __init__(self, filename, compression="jpeg", quality=90):
+        """Write images to a pdf one page at a time. Each page is written to disk
+        when it is added, so only one frame is held in memory. The file is
+        finished on close, which also happens on errors when used as a context
+        manager, so the pages written so far are kept.
+
+        Parameter
+        ---------
+        filename : str
+            output pdf
+        compression : str
+            'jpeg' (lossy, as PIL writes pdfs), 'png' (lossless deflate) or None
+        quality : int
+            jpeg quality
+        """
+        if compression not in ["jpeg", "png", None]:
+            raise ValueError(f"Unknown compression: {compression}")
+        self.compression = compression
+        self.quality = quality
+        self.f = open(filename, "wb")
+        self.f.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        # object 1 is the catalog and 2 the page tree, written on close
+        self.offsets = {}
+        self.n_objects = 2
+        self.pages = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _write_object(self, body, stream=None, obj_id=None):
+        if obj_id is None:
+            self.n_objects += 1
+            obj_id = self.n_objects
+        self.offsets[obj_id] = self.f.tell()
+        self.f.write(f"{obj_id} 0 obj\n".encode() + body)
+        if stream is not None:
+            self.f.write(b"\nstream\n" + stream + b"\nendstream")
+        self.f.write(b"\nendobj\n")
+        return obj_id
+
+    def add_page(self, image):
+        """append a PIL image as a page of the same size in points"""
+        image = image.convert("RGB")
+        w, h = image.size
+        if self.compression == "jpeg":
+            buf = io.BytesIO()
+            image.save(buf, "JPEG", quality=self.quality)
+            data, filt = buf.getvalue(), b"/Filter /DCTDecode "
+        elif self.compression == "png":
+            data, filt = zlib.compress(image.tobytes()), b"/Filter /FlateDecode "
+        else:
+            data, filt = image.tobytes(), b""
+        im_id = self._write_object(
+            b"<< /Type /XObject /Subtype /Image /Width %d /Height %d " % (w, h)
+            + b"/ColorSpace /DeviceRGB /BitsPerComponent 8 " + filt
+            + b"/Length %d >>" % len(data), data)
+        content = b"q %d 0 0 %d 0 0 cm /Im0 Do Q" % (w, h)
+        content_id = self._write_object(b"<< /Length %d >>" % len(content), content)
+        self.pages.append(self._write_object(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] " % (w, h)
+            + b"/Resources << /XObject << /Im0 %d 0 R >> >> /Contents %d 0 R >>" % (im_id, content_id)))
+        self.f.flush()
+
+    def close(self):
+        """write the page tree, cross-reference table and trailer"""
+        if self.f.closed: return
+        kids = b" ".join(b"%d 0 R" % page for page in self.pages)
+        self._write_object(b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(self.pages)), obj_id=2)
+        self._write_object(b"<< /Type /Catalog /Pages 2 0 R >>", obj_id=1)
+        xref = self.f.tell()
+        self.f.write(b"xref\n0 %d\n0000000000 65535 f \n" % (self.n_objects + 1))
+        for obj_id in range(1, self.n_objects + 1):
+            self.f.write(b"%010d 00000 n \n" % self.offsets[obj_id])
+        self.f.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+                     % (self.n_objects + 1, xref))
+        self.f.close()
@@ -1,7 +1,16 @@
 """This module contains useful planes for physics
 
 """
-from manimlib import NumberPlane, Axes, TexMobject, BLACK
+import numpy as np
+from manimlib import NumberPlane, Axes, Tex, VGroup, VMobject, Animation, BLACK, ORIGIN, UP, DOWN, LEFT, RIGHT
+
+
+def lorentz_matrix(rapidity, x_unit=1, y_unit=1):
+    """2x2 lorentz boost acting on frame coordinates of (x, ct), when one unit
+    of x and ct is x_unit and y_unit long on screen: diag(u) L diag(1/u)"""
+    ch, sh = np.cosh(rapidity), np.sinh(rapidity)
+    return np.array([[ch, sh*x_unit/y_unit],
+                     [sh*y_unit/x_unit, ch]])
 
 
 class BoostPlane(NumberPlane):
@@ -23,6 +32,10 @@ class BoostPlane(NumberPlane):
         """Plane used for relativity boosting"""
         Axes.__init__(self, **kwargs)
         self.rot = rot
+        # tan(rot) = v/c = tanh(rapidity)
+        self.rapidity = np.arctanh(np.tan(rot))
+        self.unit_sizes = (self.get_x_axis().get_unit_size(), self.get_y_axis().get_unit_size())
+        self.worldlines = VGroup()
         self.get_x_axis().rotate(rot, about_point=ORIGIN)
         self.get_y_axis().rotate(-rot, about_point=ORIGIN)
         self.init_background_lines()
@@ -32,7 +45,91 @@ class BoostPlane(NumberPlane):
         # axes and label
         xaxis = self.get_vector((self.axis_arrow_size,0))
         yaxis = self.get_vector((0,self.axis_arrow_size))
-        xlabel = TexMobject(self.xlabel).next_to(xaxis, DOWN).shift(3*RIGHT)
-        ylabel = TexMobject(self.ylabel).next_to(yaxis, LEFT).shift(3*UP)
+        xlabel = Tex(self.xlabel).next_to(xaxis, DOWN).shift(3*RIGHT)
+        ylabel = Tex(self.ylabel).next_to(yaxis, LEFT).shift(3*UP)
+        self.axis_vectors = VGroup(xaxis, yaxis)
+        self.axis_labels = VGroup(xlabel, ylabel)
         axes = VGroup(xaxis, yaxis, xlabel, ylabel)
         self.add_to_back(axes)
+
+    def get_boost_matrix(self, rapidity):
+        """lorentz_matrix in the units of the plane as it was created"""
+        return lorentz_matrix(rapidity, *self.unit_sizes)
+
+    def add_worldline(self, mob):
+        """attach a mobject drawn in the coordinates of the plane, e.g. a
+        worldline, so that boosts transform it with the plane"""
+        self.worldlines.add(mob)
+        self.add(mob)
+        return mob
+
+    def get_worldline(self, x, t, **kwargs):
+        """polyline through the events (x, ct), attached to the plane"""
+        line = VMobject(**kwargs)
+        line.set_points_as_corners(self.c2p(np.asarray(x), np.asarray(t)))
+        return self.add_worldline(line)
+
+    def get_boosted_mobjects(self):
+        """family members whose points are boosted: everything but the axis
+        labels, which only move so that the text is not sheared"""
+        labels = set(self.axis_labels.get_family())
+        return [mob for mob in self.family_members_with_points() if mob not in labels]
+
+    def boost(self, rapidity):
+        """boost the plane and its worldlines by rapidity in place"""
+        matrix = self.get_boost_matrix(rapidity)
+        origin = self.c2p(0, 0)[:2]
+        for mob in self.get_boosted_mobjects():
+            points = mob.get_points()
+            points[:, :2] = (points[:, :2] - origin) @ matrix.T + origin
+        for label in self.axis_labels:
+            center = label.get_center()
+            label.move_to(np.array([*(center[:2] - origin) @ matrix.T + origin, center[2]]))
+        self.rapidity += rapidity
+        self.refresh_bounding_box(recurse_down=True)
+        return self
+
+
+class Boost(Animation):
+    def __init__(self, plane, rapidity, **kwargs):
+        """Boost a BoostPlane and its worldlines by rapidity. Every frame is a
+        single 2x2 matrix product over the points of the whole plane, which are
+        gathered into one buffer when the animation begins, so the grid is
+        transformed in place instead of being rebuilt. To boost to a given
+        rapidity, pass its difference to plane.rapidity."""
+        self.rapidity = rapidity
+        super().__init__(plane, **kwargs)
+
+    def create_starting_mobject(self):
+        # the start is kept as one array in begin, no copy of the plane needed
+        return self.mobject
+
+    def begin(self):
+        plane = self.mobject
+        self.mobs = plane.get_boosted_mobjects()
+        sizes = [len(mob.get_points()) for mob in self.mobs]
+        self.start = np.concatenate([mob.get_points() for mob in self.mobs])
+        self.buffer = self.start.copy()
+        # the points of every mobject become a view into the buffer
+        offsets = np.cumsum([0] + sizes)
+        for mob, a, b in zip(self.mobs, offsets[:-1], offsets[1:]):
+            mob.data["points"] = self.buffer[a:b]
+        self.origin = plane.c2p(0, 0)[:2]
+        self.label_starts = [label.get_center() for label in plane.axis_labels]
+        self.start_rapidity = plane.rapidity
+        super().begin()
+
+    def interpolate_mobject(self, alpha):
+        plane = self.mobject
+        matrix = plane.get_boost_matrix(alpha*self.rapidity)
+        self.buffer[:, :2] = (self.start[:, :2] - self.origin) @ matrix.T + self.origin
+        for label, start in zip(plane.axis_labels, self.label_starts):
+            label.move_to(np.array([*(start[:2] - self.origin) @ matrix.T + self.origin, start[2]]))
+        plane.rapidity = self.start_rapidity + alpha*self.rapidity
+
+    def finish(self):
+        super().finish()
+        # give the mobjects their own arrays back
+        for mob in self.mobs:
+            mob.data["points"] = mob.data["points"].copy()
+        self.mobject.refresh_bounding_box(recurse_down=True)
@@ -2,6 +2,10 @@ from manimlib import *
 
 import numpy as np
 from scipy import interpolate as sinterp
+from matplotlib import collections as mpl_collections
+from matplotlib import colors as mpl_colors
+from matplotlib import lines as mpl_lines
+from matplotlib import patches as mpl_patches
 
 from vidlib.utils import *
 
@@ -23,8 +27,26 @@ class MyAxes(Axes):
             if c: kwargs['color'] = c2hex(c)
             if alpha: kwargs['stroke_opacity'] = alpha
             return self.get_graph(f, x_range=x_range, **kwargs)
+        elif fmt in mpl_lines.Line2D.markers:
+            # all markers in one DotCloud, drawn as dots
+            cloud = DotCloud(self.coords_to_points(x, y), **kwargs)
+            if c: cloud.set_color(c2hex(c))
+            if alpha: cloud.set_opacity(alpha)
+            return cloud
         else:
-            raise NotImplemented
+            raise NotImplementedError(f"Unsupported fmt: {fmt}")
+
+    def coords_to_points(self, xs, ys):
+        """(N, 3) points of arrays of x and y. The stock number_to_point only
+        takes scalars, so each axis is mapped through the two points of 0 and
+        1 on it, which holds as the axes are linear."""
+        xs, ys = np.asarray(xs, dtype=float), np.asarray(ys, dtype=float)
+        points = np.tile(self.c2p(0, 0), (len(xs), 1))
+        for axis, coords in zip([self.get_x_axis(), self.get_y_axis()], [xs, ys]):
+            p0 = axis.number_to_point(0)
+            points += np.outer(coords, axis.number_to_point(1) - p0)
+        return points
+
     def loglog(self, x, y, **kwargs):
         return self.plot(np.log10(x), np.log10(y), **kwargs)
 
@@ -55,6 +77,15 @@ class MplAxisWrapper(CoordinateSystem, VGroup):
         "color": WHITE,
         "use_tex": False,
         "label_fontsize": 24,
+        # sample all lines with numpy at once instead of one ParametricCurve
+        # callback per point
+        "vectorized": True,
+        # level of detail for dense data: None, 'minmax' or 'lttb'. Lines with
+        # more samples than lod_points_per_pixel per pixel column of the x axis
+        # are decimated and drawn as polylines, which keeps their peaks
+        "lod": None,
+        "lod_points_per_pixel": 2,
+        "pixel_width": DEFAULT_PIXEL_WIDTH,
     }
     def __init__(self, ax, **kwargs):
         """Take an mpl axis instance to produce a VGroup that look like it
@@ -71,7 +102,8 @@ class MplAxisWrapper(CoordinateSystem, VGroup):
         xticks = np.sort(np.concatenate([xmajorticks, xminorticks]))
         xaxis = MyNumberLine(xticks=xticks, x_range=xlim, width=self.width,
                              numbers_with_elongated_ticks=xmajorticks,
-                             xscale=ax.get_xscale(), numbers_to_exclude=xminorticks,
+                             xscale=ax.get_xscale(), scale_config=get_scale_config(ax.get_xaxis()),
+                             numbers_to_exclude=xminorticks,
                              tick_direction=self.tick_direction,
                              color=self.color, decimal_number_config={'color': self.color})
         xaxis.shift(-xaxis.n2p(xlim[0]))
@@ -88,7 +120,8 @@ class MplAxisWrapper(CoordinateSystem, VGroup):
         yaxis = MyNumberLine(xticks=yticks, x_range=ylim, width=self.height,
                              line_to_number_direction=UP,
                              numbers_with_elongated_ticks=ymajorticks,
-                             xscale=ax.get_yscale(), numbers_to_exclude=yminorticks,
+                             xscale=ax.get_yscale(), scale_config=get_scale_config(ax.get_yaxis()),
+                             numbers_to_exclude=yminorticks,
                              tick_direction=self.tick_direction,
                              color=self.color, decimal_number_config={'color': self.color})
         yaxis.shift(-yaxis.n2p(ylim[0]))
@@ -105,49 +138,204 @@ class MplAxisWrapper(CoordinateSystem, VGroup):
                                             color=self.color, font_size=self.label_fontsize)
         self.add(self.xlabel, self.ylabel)
 
-        # parse lines
-        lines = []
+        # frame units per typographic point, to convert marker sizes
+        self.pt = self.width / (ax.bbox.width*72/ax.figure.dpi)
+
+        # parse lines, lines without a line style only show their markers
+        lines, markers = [], []
         for line in ax.get_lines():
             line_color = line.get_color()
-            line_x, line_y = line.get_data()
+            line_x, line_y = map(np.asarray, line.get_data())
             _, mask_x = filter_by_lim(line_x, xlim, return_mask=True)
             _, mask_y = filter_by_lim(line_y, ylim, return_mask=True)
             mask = mask_x
-            line_x = line_x[mask]
-            line_y = line_y[mask]
-            t = np.linspace(0, 1, len(line_x))
-            fx = sinterp.interp1d(t, line_x, kind='cubic')
-            fy = sinterp.interp1d(t, line_y, kind='cubic')
-            graph = ParametricCurve(
-                lambda t: self.c2p(fx(t), fy(t)),
-                t_range=[0, 1, 1/self.npl],
-                color=c2hex(line_color),
-            )
-            lines.append(graph)
-        self.lines = VGroup(*lines)
+            if line.get_linestyle() not in ['None', '', ' ']:
+                lines.append((line_x[mask], line_y[mask], {'color': c2hex(line_color)}))
+            if line.get_marker() not in [None, 'None', '', ' ']:
+                mask = mask_x * mask_y
+                colors = mpl_colors.to_rgba_array(line.get_markerfacecolor(), line.get_alpha())
+                # hollow markers are drawn in their edge color
+                if len(colors) == 0:
+                    colors = mpl_colors.to_rgba_array(line.get_markeredgecolor(), line.get_alpha())
+                if len(colors) > 0:
+                    markers.append(self.get_markers(
+                        line_x[mask], line_y[mask], s=line.get_markersize()**2, c=colors
+                    ))
+        self.lines = VGroup(*self.get_curves(lines))
         self.add(self.lines)
+
+        # parse scatter plots, error bars and bar/hist patches, each collection
+        # or color becomes one mobject however many markers it has
+        for coll in ax.collections:
+            if isinstance(coll, mpl_collections.PathCollection):
+                coll.update_scalarmappable()
+                x, y = np.asarray(coll.get_offsets()).T
+                _, mask_x = filter_by_lim(x, xlim, return_mask=True)
+                _, mask_y = filter_by_lim(y, ylim, return_mask=True)
+                mask = mask_x * mask_y
+                sizes, colors = coll.get_sizes(), coll.get_facecolors()
+                if len(colors) == 0: colors = coll.get_edgecolors()
+                if len(colors) == 0: continue
+                if len(sizes) > 1: sizes = sizes[mask]
+                if len(colors) > 1: colors = colors[mask]
+                markers.append(self.get_markers(x[mask], y[mask], s=sizes, c=colors))
+            elif isinstance(coll, mpl_collections.LineCollection):
+                self.add(self.get_segments(coll.get_segments(), color=c2hex(tuple(coll.get_colors()[0]))))
+        self.markers = Group(*markers)
+        self.add(self.markers)
+        self.bars = VGroup(*self.get_bars([
+            patch for patch in ax.patches if isinstance(patch, mpl_patches.Rectangle)
+        ]))
+        self.add(self.bars)
         self.center()
 
-    def plot(self, line_x, line_y, fmt='-', c=None, alpha=1, x_range=None, **kwargs):
+    def plot(self, line_x, line_y, fmt='-', c=None, alpha=1, x_range=None, ms=6, **kwargs):
         if fmt == '-':
-            # import ipdb; ipdb.set_trace()
             _, mask_x = filter_by_lim(line_x, self.xlim, return_mask=True)
             _, mask_y = filter_by_lim(line_y, self.ylim, return_mask=True)
             mask = mask_x
-            line_x = line_x[mask]
-            line_y = line_y[mask]
-            t = np.linspace(0, 1, len(line_x))
-            fx = sinterp.interp1d(t, line_x, kind='cubic')
-            fy = sinterp.interp1d(t, line_y, kind='cubic')
-            graph = ParametricCurve(
-                lambda t: self.c2p(fx(t), fy(t)),
-                t_range=[0, 1, 1/self.npl],
-                color=c2hex(c),
-                stroke_opacity=alpha,
+            style = {'color': c2hex(c), 'stroke_opacity': alpha}
+            return self.get_curves([(line_x[mask], line_y[mask], style)])[0]
+        elif fmt in mpl_lines.Line2D.markers:
+            return self.scatter(line_x, line_y, s=ms**2, c=c, alpha=alpha)
+        else:
+            raise NotImplementedError(f"Unsupported fmt: {fmt}")
+
+    def scatter(self, x, y, s=36, c=None, alpha=1):
+        """markers at (x, y) within the axis limits, like plt.scatter
+
+        Parameter
+        ---------
+        s : float or array
+            marker area in points^2
+        c : color or array of colors
+        """
+        x, y = np.asarray(x), np.asarray(y)
+        _, mask_x = filter_by_lim(x, self.xlim, return_mask=True)
+        _, mask_y = filter_by_lim(y, self.ylim, return_mask=True)
+        mask = mask_x * mask_y
+        s = np.broadcast_to(s, x.shape)[mask]
+        colors = mpl_colors.to_rgba_array(c if c is not None else self.color, alpha)
+        if len(colors) > 1: colors = colors[mask]
+        return self.get_markers(x[mask], y[mask], s=s, c=colors)
+
+    def get_markers(self, x, y, s, c):
+        """One DotCloud with a marker at each (x, y). All markers are drawn as dots.
+
+        Parameter
+        ---------
+        s : float or array
+            marker area in points^2, as in matplotlib
+        c : array
+            (1, 4) or (N, 4) rgba colors
+        """
+        cloud = DotCloud(self.coords_to_points(x, y))
+        cloud.set_radii(np.broadcast_to(np.sqrt(s)/2*self.pt, (len(x),)))
+        cloud.set_rgba_array(np.broadcast_to(c, (len(x), 4)).copy())
+        return cloud
+
+    def get_segments(self, segments, **kwargs):
+        """One VMobject with a straight subpath for each of the segments, e.g.
+        the bars of an errorbar plot
+
+        Parameter
+        ---------
+        segments : list of array
+            [(k, 2) array of x and y, ...]
+        """
+        segments = [np.asarray(seg) for seg in segments if len(seg) > 1]
+        mob = VMobject(**kwargs)
+        if len(segments) == 0: return mob
+        vertices = np.vstack(segments)
+        points = self.coords_to_points(vertices[:, 0], vertices[:, 1])
+        # drop the edges that join the last vertex of a segment to the next one
+        edge = np.ones(len(points) - 1, dtype=bool)
+        edge[np.cumsum([len(seg) for seg in segments])[:-1] - 1] = False
+        start, end = points[:-1][edge], points[1:][edge]
+        return mob.set_anchors_and_handles(start, (start + end)/2, end)
+
+    def get_bars(self, rects):
+        """Filled VMobjects for matplotlib Rectangles such as bars and histograms,
+        one per face color, with each rectangle as a closed subpath"""
+        by_color = {}
+        for rect in rects:
+            by_color.setdefault(tuple(rect.get_facecolor()), []).append(
+                (rect.get_x(), rect.get_y(), rect.get_width(), rect.get_height())
             )
-            return graph
+        bars = []
+        for color, boxes in by_color.items():
+            x, y, w, h = np.array(boxes).T
+            # corners in drawing order, clipped to the axis limits
+            cx = np.clip(np.stack([x, x + w, x + w, x, x], axis=1), *sorted(self.xlim))
+            cy = np.clip(np.stack([y, y, y + h, y + h, y], axis=1), *sorted(self.ylim))
+            corners = self.coords_to_points(cx.ravel(), cy.ravel()).reshape(len(x), 5, 3)
+            start, end = corners[:, :-1].reshape(-1, 3), corners[:, 1:].reshape(-1, 3)
+            mob = VMobject(fill_color=c2hex(color[:3]), fill_opacity=color[3], stroke_width=0)
+            bars.append(mob.set_anchors_and_handles(start, (start + end)/2, end))
+        return bars
+
+    def get_curves(self, lines):
+        """Make smooth curves through data, sampled with npl+1 points each.
+
+        Parameter
+        ---------
+        lines : list of tuple
+            [(x, y, style), ...] where style is a dict of VMobject kwargs
+
+        Return
+        ------
+        list of VMobject
+
+        """
+        t = np.linspace(0, 1, self.npl + 1)
+        n_lod = self.get_lod_size()
+        samples, smooth = [], []
+        for x, y, style in lines:
+            if n_lod is not None and len(x) > n_lod:
+                keep = self.decimate(x, y)
+                samples.append(np.vstack([x[keep], y[keep]]))
+                smooth.append(False)
+            else:
+                samples.append(sinterp.interp1d(np.linspace(0, 1, len(x)), np.vstack([x, y]), kind='cubic'))
+                smooth.append(True)
+        if not self.vectorized:
+            return [
+                ParametricCurve(lambda t: self.c2p(*f(t)), t_range=[0, 1, 1/self.npl], **style)
+                if is_smooth else VMobject(**style).set_points_as_corners(self.coords_to_points(*f))
+                for f, is_smooth, (_, _, style) in zip(samples, smooth, lines)
+            ]
+        if len(lines) == 0: return []
+        # convert the samples of all lines to points in one pass
+        samples = [f(t) if is_smooth else f for f, is_smooth in zip(samples, smooth)]
+        xs, ys = np.hstack(samples)
+        points = self.coords_to_points(xs, ys)
+        splits = np.cumsum([s.shape[1] for s in samples])[:-1]
+        curves = []
+        for pts, is_smooth, (_, _, style) in zip(np.split(points, splits), smooth, lines):
+            curve = VMobject(**style)
+            curve.set_points_as_corners(pts)
+            if is_smooth: curve.make_approximately_smooth()
+            curves.append(curve)
+        return curves
+
+    def get_lod_size(self):
+        """number of points a decimated line keeps, from the width of the x axis
+        on screen, or None if lod is off"""
+        if self.lod is None: return None
+        columns = self.xaxis.get_length()/FRAME_WIDTH*self.pixel_width
+        return max(int(columns*self.lod_points_per_pixel), 3)
+
+    def decimate(self, x, y):
+        """indices of the samples of a line kept by the lod method. Decimation
+        happens in screen space, so log and other scales are handled too."""
+        ax, ay = self.xaxis.number_to_alpha(x), self.yaxis.number_to_alpha(y)
+        n = self.get_lod_size()
+        if self.lod == 'minmax':
+            return minmax_decimate(ax, ay, n//2)
+        elif self.lod == 'lttb':
+            return lttb_decimate(ax, ay, n)
         else:
-            raise NotImplemented
+            raise ValueError(f"Unknown lod method: {self.lod}")
 
     def get_axis_label(self, label_tex, axis, edge, direction, buff=MED_SMALL_BUFF, rotate=0, **kwargs):
         if self.use_tex: 
@@ -166,13 +354,19 @@ class MplAxisWrapper(CoordinateSystem, VGroup):
         return self.axes
 
     def coords_to_point(self, *coords):
+        """point of (x, y), or an (N, 3) array of points if x and y are arrays"""
         origin = self.xaxis.number_to_point(self.xlim[0])
         result = origin.copy()
         for axis, coord in zip(self.get_axes(), coords):
-            result += (axis.number_to_point(coord) - origin)
+            result = result + (axis.number_to_point(coord) - origin)
         return result
 
+    def coords_to_points(self, xs, ys):
+        """coords_to_point for arrays of x and y, returning an (N, 3) array"""
+        return self.coords_to_point(np.asarray(xs), np.asarray(ys))
+
     def point_to_coords(self, point):
+        """(x, y) of a point, or a tuple of arrays if point is an (N, 3) array"""
         return tuple([
             axis.point_to_number(point)
             for axis in self.get_axes()
@@ -188,6 +382,8 @@ class MyNumberLine(NumberLine):
         "tick_direction": "out",
         "xticks": None,
         "xscale": 'linear',
+        # parameters of 'symlog' scale: linthresh, linscale and base
+        "scale_config": {},
         "include_tip": True,
         "include_numbers": True,
         "tick_size": 0.025,
@@ -225,28 +421,147 @@ class MyNumberLine(NumberLine):
         result.match_style(self)
         return result
 
+    def get_scale_transform(self):
+        """forward and inverse functions of the scale, and the forward values of
+        x_min and x_max. These are cached until the scale or the range changes."""
+        key = (self.xscale, self.x_min, self.x_max, tuple(sorted(self.scale_config.items())))
+        if getattr(self, '_scale_key', None) != key:
+            forward, inverse = get_scale_functions(self.xscale, **self.scale_config)
+            self._scale_transform = (forward, inverse, forward(self.x_min), forward(self.x_max))
+            self._scale_key = key
+        return self._scale_transform
+
+    def number_to_alpha(self, number):
+        """fraction of the way along the line of a number or an array of numbers"""
+        forward, _, f_min, f_max = self.get_scale_transform()
+        return (forward(np.asarray(number, dtype=float)) - f_min) / (f_max - f_min)
+
     def number_to_point(self, number):
-        if self.xscale == 'linear':
-            alpha = float(number - self.x_min) / (self.x_max - self.x_min)
-        elif self.xscale == 'log':
-            alpha = (np.log10(number)-np.log10(self.x_min))/(np.log10(self.x_max)-np.log10(self.x_min))
-        else: raise NotImplemented
-        return interpolate(self.get_start(), self.get_end(), alpha)
+        """point of a number, or an (N, 3) array of points of an array of numbers"""
+        start, end = self.get_start(), self.get_end()
+        return start + np.multiply.outer(self.number_to_alpha(number), end - start)
 
     def point_to_number(self, point):
+        """number of a point, or an array of numbers of an (N, 3) array of points"""
         start, end = self.get_start_and_end()
         unit_vect = normalize(end - start)
-        proportion = fdiv(
-            np.dot(point - start, unit_vect),
-            np.dot(end - start, unit_vect),
-        )
-        if self.xscale == 'linear':
-            return interpolate(self.x_min, self.x_max, proportion)
-        elif self.xscale == 'log':
-            return 10**(interpolate(np.log10(self.x_min), np.log10(self.x_max), proportion))
+        proportion = np.dot(np.asarray(point) - start, unit_vect) / np.dot(end - start, unit_vect)
+        _, inverse, f_min, f_max = self.get_scale_transform()
+        return inverse(f_min + proportion*(f_max - f_min))
 
     def get_unit_size(self):
-        if self.xscale == 'linear':
-            return self.get_length() / (self.x_max - self.x_min)
-        elif self.xscale == 'log':
+        if self.xscale == 'log':
             return self.get_length() / (np.log(self.x_max) - np.log(self.x_min))
+        _, _, f_min, f_max = self.get_scale_transform()
+        return self.get_length() / (f_max - f_min)
+
+
+def minmax_decimate(x, y, n_columns):
+    """Indices of the minimum and maximum of y within each of n_columns equal bins
+    of x, in their original order. x is expected in [0, 1] and sorted, e.g. the
+    on-screen position of a time series. Peaks survive at any decimation.
+
+    Parameter
+    ---------
+    x, y : array
+        positions and values of the samples
+    n_columns : int
+        number of bins, e.g. pixel columns
+
+    Return
+    ------
+    array of int
+    """
+    n = len(y)
+    col = np.clip((np.asarray(x)*n_columns).astype(int), 0, n_columns - 1)
+    starts = np.flatnonzero(np.r_[True, col[1:] != col[:-1]])
+    counts = np.diff(np.r_[starts, n])
+    idx = np.arange(n)
+    keep = [[0, n - 1]]
+    for reduce in (np.minimum, np.maximum):
+        extreme = np.repeat(reduce.reduceat(y, starts), counts)
+        keep.append(np.minimum.reduceat(np.where(y == extreme, idx, n), starts))
+    keep = np.unique(np.concatenate(keep))
+    return keep[keep < n]
+
+
+def lttb_decimate(x, y, n_out):
+    """Indices of n_out samples picked with largest-triangle-three-buckets, which
+    keeps the visual shape of a line. x should be sorted.
+
+    Parameter
+    ---------
+    x, y : array
+        positions and values of the samples
+    n_out : int
+        number of samples to keep
+
+    Return
+    ------
+    array of int
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3: return np.arange(n)
+    # the first and last samples are kept, the rest is split into n_out-2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    edges = np.r_[edges, n]
+    keep = np.empty(n_out, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i+1]
+        # average of the next bucket, or the last sample for the last bucket
+        nlo, nhi = edges[i+1], edges[i+2]
+        avg_x, avg_y = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        area = np.abs((x[a] - avg_x)*(y[lo:hi] - y[a]) - (x[a] - x[lo:hi])*(avg_y - y[a]))
+        a = lo + np.argmax(area)
+        keep[i+1] = a
+    return keep
+
+
+def get_scale_functions(scale, linthresh=1, linscale=1, base=10):
+    """forward and inverse functions of a matplotlib axis scale, on arrays
+
+    Parameter
+    ---------
+    scale : str
+        one of 'linear', 'log', 'symlog' and 'logit'
+    linthresh, linscale, base : float
+        parameters of 'symlog', as in matplotlib
+
+    Return
+    ------
+    tuple of function
+        (forward, inverse)
+    """
+    if scale == 'linear':
+        return (lambda x: x), (lambda y: y)
+    elif scale == 'log':
+        return np.log10, (lambda y: 10**y)
+    elif scale == 'symlog':
+        # same transform as matplotlib.scale.SymmetricalLogTransform
+        linscale_adj = linscale / (1 - 1/base)
+        def forward(x):
+            abs_x = np.abs(x)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                log = np.sign(x)*linthresh*(linscale_adj + np.log(abs_x/linthresh)/np.log(base))
+            return np.where(abs_x <= linthresh, x*linscale_adj, log)
+        def inverse(y):
+            abs_y = np.abs(y)
+            with np.errstate(over='ignore'):
+                exp = np.sign(y)*linthresh*np.power(base, abs_y/linthresh - linscale_adj)
+            return np.where(abs_y <= linthresh*linscale_adj, y/linscale_adj, exp)
+        return forward, inverse
+    elif scale == 'logit':
+        return (lambda x: np.log10(x/(1 - x))), (lambda y: 1/(1 + 10**(-y)))
+    else:
+        raise NotImplementedError(f"Unsupported scale: {scale}")
+
+
+def get_scale_config(axis):
+    """parameters of a matplotlib axis' scale that MyNumberLine needs"""
+    if axis.get_scale() == 'symlog':
+        transform = axis.get_transform()
+        return {'linthresh': transform.linthresh, 'linscale': transform.linscale,
+                'base': transform.base}
+    return {}
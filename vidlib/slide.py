@@ -1,5 +1,22 @@
+import glob
+import importlib.util
+import inspect
+import multiprocessing
+import os
+import tempfile
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+
+from PIL import Image
 from manimlib import *
+from vidlib.cache import RenderCache, fingerprint
 from vidlib.colors import *
+from vidlib.filter import MobjectIndex
+from vidlib.pdf import PdfWriter
+from vidlib.text import cached_text
+from vidlib.timing import Profiler
 
 C = colorscheme['default']
 
@@ -29,6 +46,8 @@ class Slide(Group):
         }
     }
     def __init__(self):
+        # set by the slide show, which keeps it up to date through add/remove
+        self.index = None
         super().__init__()
         self.last_mob = None
         self.bg = FullScreenRectangle(fill_color=self.style['bg']['color'])
@@ -38,6 +57,16 @@ class Slide(Group):
         # whether to auto advance to the next slide when animations are done
         self.auto_advance = False
 
+    def add(self, *mobjects):
+        super().add(*mobjects)
+        if self.index is not None: self.index.add(*mobjects)
+        return self
+
+    def remove(self, *mobjects, **kwargs):
+        super().remove(*mobjects, **kwargs)
+        if self.index is not None: self.index.remove(*mobjects)
+        return self
+
     def add_stage(self, *stages, **kwargs):
         """Add a presentation stage. Input could be anything that
         gets passed to self.play() or a callable function which takes
@@ -56,16 +85,16 @@ class Slide(Group):
         return None
 
     def h1(self, text):
-        return Text(text, font_size=self.style['h1']['fs'],
-                    color=self.style['h1']['color'])
+        return cached_text(text, font_size=self.style['h1']['fs'],
+                           color=self.style['h1']['color'])
 
     def h2(self, text):
-        return Text(text, font_size=self.style['h2']['fs'],
-                    color=self.style['h2']['color'])
+        return cached_text(text, font_size=self.style['h2']['fs'],
+                           color=self.style['h2']['color'])
 
     def h3(self, text):
-        return Text(text, font_size=self.style['h3']['fs'],
-                    color=self.style['h3']['color'])
+        return cached_text(text, font_size=self.style['h3']['fs'],
+                           color=self.style['h3']['color'])
 
     def add_rel(self, mob, side=DOWN):
         """alias for add_v, with a slighly better to understand name"""
@@ -123,8 +152,33 @@ class Slide(Group):
         return blist
 
 
+class LazySlide(Group):
+    def __init__(self, factory):
+        """Placeholder of a slide that is built by factory() when it is about
+        to be shown. It has the size of the frame, like a Slide, so that the
+        slides after it can be placed next to it."""
+        super().__init__()
+        self.factory = factory
+        self.add(FullScreenRectangle(stroke_width=0, fill_opacity=0))
+        self.stages = []
+        self.auto_advance = False
+        self.add_to_scene = True
+        self.pagenum = None
+
+    def build(self):
+        """run the factory, can be called from a worker thread"""
+        return self.factory()
+
+
 class SlideShow(Scene):
     def __init__(self, dev=True, **kwargs):
+        # key and mouse input waiting to be handled by update_frame, whether
+        # a play or wait is running, and whether input made it skip
+        self.input_queue = deque()
+        self.busy = False
+        self.input_skipping = False
+        # every slide and everything added to the scene, by type and field
+        self.index = MobjectIndex()
         if dev:
             print("Entering dev mode")
             InteractiveScene.__init__(self, **kwargs)
@@ -137,6 +191,78 @@ class SlideShow(Scene):
         self.transition_time = 0
         self.dev = dev
         self.refs = {}
+        # set in worker processes of to_pdf_parallel
+        self.export_shard = None
+        # with a slide_window, slides further than that from the current one
+        # are taken out of the scene unless they overlap the camera frame
+        # grown by cull_margin (None keeps all, the default), and lazy slides
+        # up to prefetch_ahead after the current one are built in the background
+        self.slide_window = None
+        self.cull_margin = 0.5
+        self.prefetch_ahead = 2
+        self.prefetcher = ThreadPoolExecutor(max_workers=1)
+        self.prefetched = {}
+        self.hidden_slides = set()
+        # slides taken out of the scene by culling, the only ones it puts back
+        self.culled_slides = set()
+        # timing, see enable_profiling
+        self.profiler = None
+        self.profile_report = None
+        self.profile_trace = None
+        self.stage = None
+        # incremental snapshots taken by save_state, oldest first
+        self.checkpoints = []
+        self.max_checkpoints = 50
+
+    def enable_profiling(self, report="timing.json", trace=None):
+        """Record the time spent building lazy slides, running stage functions,
+        in play, in each step of post_stage_handler and in frame capture, per
+        slide and stage. The report is written to report (csv if it ends with
+        .csv, json otherwise) and a chrome trace to trace when the scene ends.
+        """
+        self.profiler = Profiler()
+        self.profile_report = report
+        self.profile_trace = trace
+        return self.profiler
+
+    def profile(self, name, sid=None):
+        if self.profiler is None: return nullcontext()
+        return self.profiler.record(name, self.sid if sid is None else sid, self.stage)
+
+    def tear_down(self):
+        super().tear_down()
+        if self.profiler is None: return
+        report, trace = self.profile_report, self.profile_trace
+        if self.export_shard is not None:
+            # one report per worker of to_pdf_parallel
+            suffix = f".shard{self.export_shard['shard']}"
+            report = suffix.join(os.path.splitext(report))
+            if trace is not None: trace = suffix.join(os.path.splitext(trace))
+        self.profiler.save(report, trace)
+        self.profiler.print_summary()
+
+    @contextmanager
+    def running(self):
+        """mark the scene busy, so that input is only queued until the
+        outermost play, wait or input is done. Skipping asked for by input
+        meanwhile ends with it."""
+        busy = self.busy
+        self.busy = True
+        try:
+            yield
+        finally:
+            self.busy = busy
+            if not busy and self.input_skipping:
+                self.skip_animations = False
+                self.input_skipping = False
+
+    def play(self, *args, **kwargs):
+        with self.running(), self.profile("play"):
+            super().play(*args, **kwargs)
+
+    def wait(self, *args, **kwargs):
+        with self.running():
+            super().wait(*args, **kwargs)
 
     def setup(self):
         if self.dev: InteractiveScene.setup(self)
@@ -146,29 +272,127 @@ class SlideShow(Scene):
         pass
 
     def add_slide(self, slide=None, side=DOWN, add_to_scene=True, pagenum=True, skipfirst=True, focus=True):
+        """Add a slide after the last one. slide may also be a function that
+        takes no argument and returns a Slide, in which case the slide is only
+        built when it is about to be shown and a LazySlide stands in for it
+        until then. Lazy slides are not focused when added."""
         if slide is None: slide = Slide()
+        lazy = not isinstance(slide, Mobject) and callable(slide)
+        if lazy: slide = LazySlide(slide)
         if len(self.slides) > 0:
             if side is not None:
                 slide.next_to(self.slides[-1], side)
+        if pagenum and not (skipfirst and len(self.slides) == 0):
+            pagenum = len(self.slides)
+        else:
+            pagenum = None
+        if lazy:
+            slide.add_to_scene = add_to_scene
+            slide.pagenum = pagenum
+            self.slides.append(slide)
+            return slide
+        self.index_slide(slide)
         if add_to_scene: self.add(slide)
-        if pagenum:
-            if skipfirst and len(self.slides) == 0:
-                pass
-            else:
-                pagenum = slide.h3(f"{len(self.slides)}").scale(0.5)
-                pagenum.move_to(slide.get_bottom()+0.5*UP)
-                slide.add(pagenum)
+        else: self.hidden_slides.add(id(slide))
+        if pagenum is not None: self.add_pagenum(slide, pagenum)
         self.slides.append(slide)
         if focus: self.goto_slide(slide)
         return slide
 
+    def add_pagenum(self, slide, pagenum):
+        pagenum = slide.h3(f"{pagenum}").scale(0.5)
+        pagenum.move_to(slide.get_bottom()+0.5*UP)
+        slide.add(pagenum)
+
+    def index_slide(self, slide):
+        """index slide, and keep indexing what gets added to it later"""
+        slide.index = self.index
+        self.index.add(slide)
+
+    def add(self, *mobjects):
+        super().add(*mobjects)
+        self.index.add(*mobjects)
+        return self
+
+    def remove(self, *mobjects):
+        super().remove(*mobjects)
+        self.index.remove(*mobjects)
+        return self
+
+    def get_slide(self, sid):
+        """the slide at sid, building it first if it is lazy"""
+        slide = self.slides[sid]
+        if not isinstance(slide, LazySlide): return slide
+        future = self.prefetched.pop(sid, None)
+        built = future.result() if future is not None else self.build_slide(sid)
+        built.move_to(slide.get_center())
+        if slide.pagenum is not None: self.add_pagenum(built, slide.pagenum)
+        self.slides[sid] = built
+        self.index_slide(built)
+        # already indexed, so only the render list needs it
+        if slide.add_to_scene: self.mobjects.append(built)
+        else: self.hidden_slides.add(id(built))
+        return built
+
+    def prefetch(self, sid):
+        """build the lazy slides after sid in the background"""
+        for i in range(sid + 1, min(sid + 1 + self.prefetch_ahead, len(self.slides))):
+            if isinstance(self.slides[i], LazySlide) and i not in self.prefetched:
+                self.prefetched[i] = self.prefetcher.submit(self.build_slide, i)
+
+    def build_slide(self, sid):
+        with self.profile("build", sid):
+            return self.slides[sid].build()
+
+    def get_frame_box(self, center=None):
+        """(x0, x1, y0, y1) of the camera frame grown by cull_margin, moved to
+        center if given"""
+        frame = self.camera.frame
+        if center is None: center = frame.get_center()
+        w = frame.get_width()/2 + self.cull_margin
+        h = frame.get_height()/2 + self.cull_margin
+        return center[0] - w, center[0] + w, center[1] - h, center[1] + h
+
+    def in_view(self, slide, boxes):
+        """whether the bounding box of slide overlaps any of the frame boxes"""
+        x0, y0 = slide.get_corner(DL)[:2]
+        x1, y1 = slide.get_corner(UR)[:2]
+        return any(x0 <= bx1 and x1 >= bx0 and y0 <= by1 and y1 >= by0
+                   for bx0, bx1, by0, by1 in boxes)
+
+    def update_visible_slides(self, sids):
+        """Build the lazy slides next to any of sids, or in view of the camera
+        frame where it is now or centered on any of sids. With a slide_window,
+        keep in the scene only the slides within it of any of sids or in view,
+        and take the others out, so that refreshing and rendering only cost
+        what is on screen. Only slides culling took out are put back, so
+        what stages removed from a slide stays removed."""
+        window = 1 if self.slide_window is None else self.slide_window
+        boxes = [self.get_frame_box()]
+        boxes += [self.get_frame_box(self.slides[sid].get_center()) for sid in sids]
+        for i, slide in enumerate(self.slides):
+            near = min(abs(i - sid) for sid in sids) <= window or self.in_view(slide, boxes)
+            if near:
+                slide = self.get_slide(i)
+                # culling only changes the render list, slides stay indexed
+                if id(slide) in self.culled_slides and slide not in self.mobjects:
+                    self.culled_slides.discard(id(slide))
+                    self.mobjects.append(slide)
+            elif self.slide_window is not None and not isinstance(slide, LazySlide) \
+                    and slide in self.mobjects:
+                Scene.remove(self, slide)
+                self.culled_slides.add(id(slide))
+
     def goto_sid(self, sid, run_time=None, refresh=True):
         if not run_time: run_time = self.transition_time
         if sid >= len(self.slides): pass
-        animations = [self.camera.frame.animate.move_to(self.slides[sid].get_center())]
+        # both ends of the transition are in the scene while the camera moves
+        self.update_visible_slides([self.sid, sid])
+        animations = [self.camera.frame.animate.move_to(self.get_slide(sid).get_center())]
         self.play(*animations, run_time=run_time)
         self.sid = sid
         print("goto:", self.sid)
+        self.prefetch(sid)
         self.post_stage_handler()
 
     def goto_slide(self, slide, run_time=0):
@@ -182,13 +406,43 @@ class SlideShow(Scene):
         super().on_key_press(symbol, modifiers)
         # if symbol in [65363,65364,65366]:  # right, down, pagedown
         if symbol in [65364,65366]:  # down, pagedown
-            if self.sid < len(self.slides) - 1:
-                self.goto_sid(self.sid+1)
+            self.queue_input("goto", 1)
 
         # if symbol in [65361,65362,65365]:  # left, up, pageup
         if symbol in [65362,65365]:  # up, pageup
-            if self.sid > 0:
-                self.goto_sid(self.sid-1)
+            self.queue_input("goto", -1)
+
+    def queue_input(self, kind, arg=None):
+        """Queue a navigation ("goto" by a number of slides, or "next" stage)
+        to be run by update_frame once the window is free, instead of running
+        it inside the event handler. If a stage is running, the rest of it is
+        skipped without rendering so that the new input is handled quickly."""
+        self.input_queue.append((kind, arg))
+        if self.busy and not self.skip_animations:
+            self.skip_animations = True
+            self.input_skipping = True
+
+    def run_input(self, kind, arg):
+        skipping = self.skip_animations
+        try:
+            with self.running():
+                # no need to show what the input already waiting will move past
+                if self.input_queue: self.skip_animations = True
+                if kind == "goto":
+                    sid = min(max(self.sid + arg, 0), len(self.slides) - 1)
+                    if sid != self.sid: self.goto_sid(sid)
+                elif kind == "next":
+                    self.next()
+        finally:
+            self.skip_animations = skipping
+
+    def update_frame(self, dt=0, ignore_skipping=False):
+        super().update_frame(dt, ignore_skipping)
+        # frames rendered by a play or wait dispatch the window events, which
+        # only queue input, so the queue is only handled by idle frames, i.e.
+        # those of the interact loop or the embed shell
+        while self.input_queue and not self.busy:
+            self.run_input(*self.input_queue.popleft())
 
     def next(self):
         """Advance animation"""
@@ -199,36 +453,62 @@ class SlideShow(Scene):
             print(e)
             pass
 
+    def save_state(self):
+        """Checkpoint the scene, copying only the mobjects that changed since
+        the last checkpoint and sharing the copies of the others. At most
+        max_checkpoints are kept. Exports never restore, so nothing is saved
+        without preview."""
+        if not self.preview: return
+        last = self.checkpoints[-1] if self.checkpoints else None
+        state = SceneCheckpoint(self, last)
+        if last is not None and state.matches(last): return
+        self.checkpoints.append(state)
+        del self.checkpoints[:-self.max_checkpoints]
+
+    def restore(self, index=-1):
+        """restore the scene to a checkpoint, by default the last one"""
+        if not self.checkpoints:
+            raise Exception("Trying to restore scene without having saved")
+        self.checkpoints[index].restore_scene(self)
+
     def post_stage_handler(self):
         """copied from scene.post_cell_func"""
-        self.refresh_static_mobjects()
+        # a stage may have moved the camera
+        self.update_visible_slides([self.sid])
+        with self.profile("refresh_static_mobjects"):
+            self.refresh_static_mobjects()
         if not self.is_window_closing():
-            self.update_frame(dt=0, ignore_skipping=True)
-        self.save_state()
+            with self.profile("update_frame"):
+                self.update_frame(dt=0, ignore_skipping=True)
+        with self.profile("save_state"):
+            self.save_state()
 
     def present(self):
         for sid in range(len(self.slides)):
-            slide = self.slides[sid]
+            slide = self.get_slide(sid)
             self.goto_slide(slide)
             # if there is animations defined, play them
             if len(slide.stages)>0:
                 print(f"sid {sid}: {len(slide.stages)} stages found")
-                for stage in slide.stages:
+                for i, stage in enumerate(slide.stages):
                     driver, kwargs = stage
                     # wait for interaction unless otherwise told
                     if kwargs.get('wait', True): yield
+                    self.stage = i
                     if callable(driver[0]):
-                        stage[0][0](slide)
+                        with self.profile("stage"):
+                            stage[0][0](slide)
                     else:  # otherwise assume it is a list of animations
                         ani, kwargs = stage
                         self.play(*ani, **kwargs)
                     self.post_stage_handler()
+                    self.stage = None
             if not slide.auto_advance: yield  # wait for interaction before going to the next slide
 
     def on_mouse_press(self, point, button, modifiers):
         # don't use SPACE to advance, it causes weird bug in manim
         super().on_mouse_press(point, button, modifiers)
-        if not self.dev: self.next()
+        if not self.dev: self.queue_input("next")
 
     def autoplay(self, wait=3):
         self.wait(wait)
@@ -236,26 +516,210 @@ class SlideShow(Scene):
             self.wait(wait)
         self.wait(wait)
 
-    def to_pdf(self, oname="slide.pdf", wait=3):
+    def iter_pages(self, wait=3, still=False):
+        """Step through the presentation and yield (page, sid) at every point
+        where a page is to be captured: before the first stage, after every
+        stage and at the end. Between pages the scene waits for wait seconds,
+        which gives each page some time in a video export.
+
+        Parameter
+        ---------
+        wait : float
+            seconds to wait after each page
+        still : bool
+            if True only still frames are needed, so animations jump to their
+            end and the waits are skipped
+        """
+        skipping = self.skip_animations
+        if still: self.skip_animations = True
+        try:
+            page = 0
+            yield page, self.sid
+            if not still: self.wait(wait)
+            for _ in self.present():
+                page += 1
+                yield page, self.sid
+                if not still: self.wait(wait)
+            yield page + 1, self.sid
+            if not still: self.wait(wait)
+        finally:
+            self.skip_animations = skipping
+
+    def get_slide_keys(self):
+        """Hash of each slide, its stages, its neighbours and the camera config.
+        Call before any stage runs, as stages change the slides."""
+        camera = fingerprint({k: v for k, v in self.camera_config.items() if k != "ctx"})
+        keys = []
+        for sid, slide in enumerate(self.slides):
+            # neighbours may show at the edges of the frame
+            origin = slide.get_center()
+            near = [(s, s.stages, getattr(s, "factory", None)) for s in self.slides[max(sid-1, 0):sid+2]]
+            keys.append(fingerprint(camera, near, origin=origin))
+        return keys
+
+    def iter_page_keys(self, wait=3, still=False):
+        """like iter_pages, but yields (page, sid, key) where key identifies the
+        content of the page from the slides as they are before presenting"""
+        slide_keys = self.get_slide_keys()
+        last, k = None, 0
+        for page, sid in self.iter_pages(wait=wait, still=still):
+            k = k + 1 if sid == last else 0
+            last = sid
+            yield page, sid, fingerprint(slide_keys[sid], k, page == 0)
+
+    def iter_export_pages(self, cache, wait=3, still=False):
+        """iter_page_keys with a cache, otherwise iter_pages with None keys,
+        as hashing the slides is only worth it when pages can be reused"""
+        if cache is not None:
+            yield from self.iter_page_keys(wait=wait, still=still)
+            return
+        for page, sid in self.iter_pages(wait=wait, still=still):
+            yield page, sid, None
+
+    def capture_cached(self, key, cache):
+        """capture the current frame, or take it from the cache if the page
+        was rendered before"""
+        if cache is None: return self.capture()
+        image = cache.get(key)
+        if image is None:
+            image = self.capture()
+            cache.put(key, image)
+        return image
+
+    def capture(self):
+        """render the current frame and return it as an RGB image"""
+        with self.profile("capture"):
+            self.update_frame(ignore_skipping=True)
+            return self.camera.get_image().convert("RGB")
+
+    def to_pdf(self, oname="slide.pdf", wait=3, still=False, processes=1, compression="jpeg", quality=90,
+               cache=False, cache_size=2*1024**3):
         """Render to pdf. This needs to run with non-preview mode,
-        such as through manimgl slide.py -w"""
-        self.update_frame()
-        im1 = self.camera.get_image()
-        im1 = im1.convert("RGB")
-        images = []
-        self.wait(wait)
-        for _ in self.present():
-            self.update_frame()
-            img = self.camera.get_image()
-            img = img.convert("RGB")
-            images.append(img)
-            self.wait(wait)
-        self.update_frame()
-        img = self.camera.get_image()
-        img = img.convert("RGB")
-        images.append(img)
-        self.wait(wait)
-        im1.save(oname, save_all=True, append_images=images)
+        such as through manimgl slide.py -w
+
+        Parameter
+        ---------
+        oname : str
+            output file name
+        wait : float
+            seconds to wait after each page, which shows up in the video
+        still : bool
+            only render still frames: skip animations and waits, no video
+        processes : int
+            number of worker processes, each rendering its share of the slides
+            in its own headless scene. This implies still.
+        compression : str
+            page compression, 'jpeg', 'png' (lossless) or None
+        quality : int
+            jpeg quality
+        cache : bool
+            reuse pages of unchanged slides from earlier exports. Pages are
+            keyed by the content and stages of their slide and its neighbours.
+            Stages still run, so a movie being written is complete, but pages
+            that hit the cache are not rendered again. Off by default, as
+            changes the keys cannot see, such as to classes the stages use,
+            would leave stale pages
+        cache_size : int
+            size limit of the cache in bytes, least recently used pages are
+            removed beyond it
+        """
+        if self.export_shard is not None:
+            return self.render_shard(**self.export_shard)
+        if processes > 1:
+            return self.to_pdf_parallel(oname, processes, compression, quality, cache, cache_size)
+        cache = RenderCache(max_size=cache_size) if cache else None
+        # pages are written as they are captured so only one frame is in memory
+        with PdfWriter(oname, compression, quality) as pdf:
+            for _, _, key in self.iter_export_pages(cache, wait=wait, still=still):
+                pdf.add_page(self.capture_cached(key, cache))
+        if cache is not None:
+            print(f"render cache: {cache.hits} hits, {cache.misses} misses")
+            cache.evict()
+
+    def render_shard(self, shard, n_shards, outdir, cache=False, cache_size=2*1024**3):
+        """render the pages of the slides with sid % n_shards == shard to
+        outdir/page_<page>.png, fast-forwarding through the others"""
+        cache = RenderCache(max_size=cache_size) if cache else None
+        for page, sid, key in self.iter_export_pages(cache, still=True):
+            if sid % n_shards == shard:
+                image = self.capture_cached(key, cache)
+                image.save(os.path.join(outdir, f"page_{page:05d}.png"))
+
+    def to_pdf_parallel(self, oname, processes, compression="jpeg", quality=90, cache=False, cache_size=2*1024**3):
+        """Render to pdf with a pool of processes. Each process loads the module
+        of this scene, runs it headless, and renders its share of the slides when
+        construct calls to_pdf. Pages are then put back together in order."""
+        scene_kwargs = {
+            "preview": False,
+            "camera_config": {k: v for k, v in self.camera_config.items() if k != "ctx"},
+            "file_writer_config": {"write_to_movie": False, "save_last_frame": False},
+        }
+        path, name = inspect.getfile(type(self)), type(self).__name__
+        with tempfile.TemporaryDirectory() as outdir:
+            ctx = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=processes, mp_context=ctx) as pool:
+                jobs = [
+                    pool.submit(_render_shard, path, name, scene_kwargs,
+                                dict(shard=shard, n_shards=processes, outdir=outdir,
+                                     cache=cache, cache_size=cache_size))
+                    for shard in range(processes)
+                ]
+                for job in jobs: job.result()
+            with PdfWriter(oname, compression, quality) as pdf:
+                for page in sorted(glob.glob(os.path.join(outdir, "page_*.png"))):
+                    with Image.open(page) as image:
+                        pdf.add_page(image)
+        if cache: RenderCache(max_size=cache_size).evict()
+
+
+def _state_crc(mob):
+    """crc32 over the data, uniforms and structure of the family of mob"""
+    crc = 0
+    for sm in mob.get_family():
+        crc = zlib.crc32(b"%d" % len(sm.submobjects), crc)
+        for key, value in sm.data.items():
+            crc = zlib.crc32(f"{key}{value.shape}".encode(), crc)
+            crc = zlib.crc32(np.ascontiguousarray(value), crc)
+        crc = zlib.crc32(repr(sorted(sm.uniforms.items())).encode(), crc)
+    return crc
+
+
+class SceneCheckpoint:
+    def __init__(self, scene, last=None):
+        """Copies of the mobjects of scene. A mobject whose crc is the same as
+        in the last checkpoint shares the copy made there, so only what
+        changed is copied."""
+        self.mobjects = list(scene.mobjects)
+        self.crcs = {}
+        self.copies = {}
+        for mob in self.mobjects:
+            crc = self.crcs[mob] = _state_crc(mob)
+            if last is not None and last.crcs.get(mob) == crc:
+                self.copies[mob] = last.copies[mob]
+            else:
+                self.copies[mob] = mob.copy()
+
+    def matches(self, state):
+        """whether state holds the same mobjects in the same state"""
+        return self.mobjects == state.mobjects and all(
+            self.copies[mob] is state.copies[mob] for mob in self.mobjects)
+
+    def restore_scene(self, scene):
+        for mob in self.mobjects:
+            # become aligns the families of both sides, so it gets a fresh copy
+            # rather than the snapshot shared with other checkpoints
+            mob.become(self.copies[mob].copy())
+        scene.mobjects = list(self.mobjects)
+
+
+def _render_shard(path, name, scene_kwargs, shard):
+    """entry point of the worker processes of SlideShow.to_pdf_parallel"""
+    spec = importlib.util.spec_from_file_location("_vidlib_deck", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    scene = getattr(module, name)(dev=False, **scene_kwargs)
+    scene.export_shard = shard
+    scene.run()
 
 
 class MultiLevelText(Group):
@@ -286,7 +750,7 @@ class MultiLevelText(Group):
         else:
             raise ValueError("Invalid marker type")
         # now create the text objects
-        texts = [Text(line, font_size=24, **kwargs) for line in lines]
+        texts = [cached_text(line, font_size=24, **kwargs) for line in lines]
         self.add(*texts)
         # arrange the text objects
         self.arrange(DOWN, aligned_edge=LEFT, buff=line_spacing)
@@ -0,0 +1,129 @@
+"""Memoized Text construction, shared by the slide helpers"""
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+import manimlib
+from manimlib import Text
+from manimlib.utils.customization import get_customization
+
+from vidlib.cache import evict_files
+from vidlib.constants import CACHE_DIR
+
+
+class TextCache:
+    def __init__(self, max_size=1024, cache_dir=None, persist=True, max_disk_size=256*1024**2):
+        """Cache of Text mobjects keyed by their class, text and keyword
+        arguments (font_size, color, font, ...). get returns a copy, which is
+        much cheaper than shaping the text and parsing its svg again. Texts
+        are kept in an in-memory LRU of max_size entries and, if persist, also
+        pickled under cache_dir so that they survive across runs, removing
+        the least recently used beyond max_disk_size bytes.
+
+        Parameter
+        ---------
+        max_size : int
+            number of texts kept in memory
+        cache_dir : str
+            directory of the on-disk cache, by default CACHE_DIR/text
+        persist : bool
+            whether to use the on-disk cache
+        max_disk_size : int
+            size limit of the on-disk cache in bytes
+        """
+        self.max_size = max_size
+        self.cache_dir = cache_dir or os.path.join(CACHE_DIR, "text")
+        self.persist = persist
+        self.max_disk_size = max_disk_size
+        self.texts = OrderedDict()
+        # slides may be built on a prefetch thread
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get_key(self, cls, text, kwargs):
+        # the default font and the manim version change what gets built
+        font = get_customization()["style"]["font"]
+        version = getattr(manimlib, "__version__", "")
+        return repr((cls.__qualname__, text, sorted(kwargs.items()), font, version))
+
+    def get_path(self, key):
+        return os.path.join(self.cache_dir, hashlib.sha1(key.encode()).hexdigest() + ".pkl")
+
+    def get(self, text, cls=Text, **kwargs):
+        """a copy of cls(text, **kwargs), built only on a miss"""
+        key = self.get_key(cls, text, kwargs)
+        with self.lock:
+            mob = self.texts.get(key)
+            if mob is not None:
+                self.texts.move_to_end(key)
+                self.hits += 1
+                return mob.copy()
+        mob = self.load(key)
+        if mob is None:
+            mob = cls(text, **kwargs)
+            self.save(key, mob)
+        with self.lock:
+            self.texts[key] = mob
+            if len(self.texts) > self.max_size:
+                self.texts.popitem(last=False)
+        return mob.copy()
+
+    def load(self, key):
+        path = self.get_path(key)
+        if self.persist and os.path.exists(path):
+            try:
+                with open(path, "rb") as f:
+                    mob = pickle.load(f)
+                os.utime(path)
+                self.disk_hits += 1
+                return mob
+            except Exception:
+                # unreadable, e.g. written by another version: build again
+                pass
+        self.misses += 1
+        return None
+
+    def save(self, key, mob):
+        if not self.persist: return
+        path = self.get_path(key)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                pickle.dump(mob, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except Exception:
+            # texts that cannot be pickled are only cached in memory
+            if os.path.exists(tmp): os.remove(tmp)
+            return
+        evict_files(os.path.join(self.cache_dir, "*.pkl"), self.max_disk_size, keep=(path,))
+
+    def clear(self, disk=False):
+        with self.lock:
+            self.texts.clear()
+        if disk and os.path.isdir(self.cache_dir):
+            for name in os.listdir(self.cache_dir):
+                os.remove(os.path.join(self.cache_dir, name))
+
+    def stats(self):
+        """number of hits in memory and on disk, misses and the hit rate"""
+        total = self.hits + self.disk_hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.disk_hits) / total if total else 0.,
+            "size": len(self.texts),
+        }
+
+
+text_cache = TextCache()
+
+
+def cached_text(text, **kwargs):
+    """Text(text, **kwargs) through the shared text_cache"""
+    return text_cache.get(text, **kwargs)
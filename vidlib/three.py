@@ -1,5 +1,10 @@
 """Modules related to three dimensions"""
-from manimlib import VGroup, Dot
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from manimlib import VGroup, Dot, DotCloud, OUT, UP, RIGHT, WHITE
+
+from vidlib.colors import set_point_colors, to_rgba_array
 
 
 class PointCloud(VGroup):
@@ -13,3 +18,325 @@ class PointCloud(VGroup):
                 ).scale(s)
             )
         self.add(dots)
+
+
+class ArrayPointCloud(DotCloud):
+    def __init__(self, xs, ys, zs, ss=1, color=WHITE, opacity=1, **kwargs):
+        """Same as PointCloud, but all points live in one DotCloud whose positions,
+        sizes and colors are contiguous arrays, so that building and updating it
+        are numpy operations rather than one Dot per point.
+
+        Parameter
+        ---------
+        xs, ys, zs : array
+            coordinates of the points, placed at x*OUT + y*UP + z*RIGHT
+        ss : float or array
+            sizes of the points, relative to a Dot
+        color : color, list of colors or (N, 3|4) array of rgb(a)
+        opacity : float or array
+        """
+        super().__init__(**kwargs)
+        self.set_positions(xs, ys, zs)
+        self.set_sizes(ss)
+        self.set_colors(color, opacity)
+
+    def set_positions(self, xs, ys=None, zs=None):
+        """move the points, given as xs, ys, zs or as one (N, 3) array of (x, y, z).
+        The points are updated in place when their number does not change."""
+        if ys is None: xs, ys, zs = np.asarray(xs).T
+        points = np.empty((len(xs), 3))
+        # x*OUT + y*UP + z*RIGHT
+        points[:, 0], points[:, 1], points[:, 2] = zs, ys, xs
+        self.set_points(points)
+        return self
+
+    def set_sizes(self, ss):
+        """set the sizes of the points, relative to a Dot"""
+        ss = np.broadcast_to(ss, (self.get_num_points(),))
+        self.set_radii(ss*Dot.CONFIG["radius"])
+        return self
+
+    def set_colors(self, colors, opacities=None):
+        """set the colors of all points at once
+
+        Parameter
+        ---------
+        colors : color, list of colors or (N, 3|4) array of rgb(a)
+        opacities : float or array
+        """
+        rgbas = to_rgba_array(colors, n=self.get_num_points())
+        if opacities is not None: rgbas[:, 3] = opacities
+        if self.data["rgbas"].shape == rgbas.shape:
+            self.data["rgbas"][:] = rgbas
+        else:
+            self.data["rgbas"] = rgbas
+        return self
+
+    def set_values(self, values, cmap='viridis', vmin=None, vmax=None, opacity=None):
+        """color the points by values through a colormap, see set_point_colors"""
+        return set_point_colors(self, values, cmap, vmin, vmax, opacity)
+
+    def set_opacities(self, opacities):
+        """set the opacities of all points at once"""
+        self.data["rgbas"][:, 3] = opacities
+        return self
+
+
+def _morton_encode(cells, depth):
+    """interleave the bits of (N, 3) integer cell coordinates into octree codes"""
+    codes = np.zeros(len(cells), dtype=np.int64)
+    for b in range(depth):
+        for dim in range(3):
+            codes |= ((cells[:, dim] >> b) & 1) << (3*b + 2 - dim)
+    return codes
+
+
+def _morton_decode(codes, depth):
+    """(N, 3) integer cell coordinates of octree codes"""
+    cells = np.zeros((len(codes), 3), dtype=np.int64)
+    for b in range(depth):
+        for dim in range(3):
+            cells[:, dim] |= ((codes >> (3*b + 2 - dim)) & 1) << b
+    return cells
+
+
+def _concat_ranges(starts, ends):
+    """np.concatenate([np.arange(s, e) for s, e in zip(starts, ends)]) without a loop"""
+    lengths = ends - starts
+    if lengths.sum() == 0: return np.zeros(0, dtype=np.int64)
+    offsets = np.repeat(starts - np.cumsum(np.r_[0, lengths[:-1]]), lengths)
+    return offsets + np.arange(lengths.sum())
+
+
+def get_frustum_planes(frame, near=1e-3):
+    """Planes bounding what a CameraFrame sees, as a (5, 4) array of (n, d) such
+    that a point p is inside when n.p + d <= 0 for every plane. This follows the
+    perspective of manim's shaders, where a point at depth z in camera space is
+    scaled by f / (f - z) with f the focal distance."""
+    rot = frame.get_inverse_camera_rotation_matrix()
+    center = frame.get_center()
+    f = frame.get_focal_distance()
+    w, h = frame.get_width()/2, frame.get_height()/2
+    # in camera space: |x| f <= w (f - z), |y| f <= h (f - z) and z < f
+    planes = np.array([
+        [ f, 0, w, -w*f],
+        [-f, 0, w, -w*f],
+        [0,  f, h, -h*f],
+        [0, -f, h, -h*f],
+        [0,  0, 1, near - f],
+    ])
+    normals = planes[:, :3] @ rot
+    return np.column_stack([normals, planes[:, 3] - normals @ center])
+
+
+class Octree:
+    def __init__(self, points, depth=6):
+        """Octree over an (N, 3) array of points. The points are sorted by the
+        Morton code of their leaf cell, so every cell at every level is a
+        contiguous range of the sorted points and needs no node objects.
+
+        Parameter
+        ---------
+        points : array
+            (N, 3) positions
+        depth : int
+            number of levels below the root, at most 20
+        """
+        self.depth = depth
+        self.lo = points.min(axis=0)
+        self.size = max(np.ptp(points, axis=0).max(), 1e-12)
+        n_cells = 2**depth
+        cells = np.clip(((points - self.lo)/self.size*n_cells).astype(np.int64), 0, n_cells - 1)
+        codes = _morton_encode(cells, depth)
+        self.order = np.argsort(codes, kind='stable')
+        self.codes = codes[self.order]
+
+    def get_cell_ranges(self, level, codes):
+        """start and end, in the sorted points, of cells at a level"""
+        shift = 3*(self.depth - level)
+        return (np.searchsorted(self.codes, codes << shift),
+                np.searchsorted(self.codes, (codes + 1) << shift))
+
+    def get_cell_boxes(self, level, codes):
+        """lower and upper corners of cells at a level"""
+        size = self.size/2**level
+        lo = self.lo + _morton_decode(codes, level)*size
+        return lo, lo + size
+
+    def query_planes(self, planes, points):
+        """indices of the points inside all planes, (K, 4) arrays of (n, d) with
+        n.p + d <= 0 inside. Cells fully inside are taken whole, cells fully
+        outside are dropped, and only points of partial leaf cells are tested."""
+        normals, d = planes[:, :3], planes[:, 3]
+        found = []
+        codes = np.zeros(1, dtype=np.int64)
+        for level in range(self.depth + 1):
+            starts, ends = self.get_cell_ranges(level, codes)
+            nonempty = ends > starts
+            codes, starts, ends = codes[nonempty], starts[nonempty], ends[nonempty]
+            lo, hi = self.get_cell_boxes(level, codes)
+            # smallest and largest n.p + d over the corners of each box
+            n_pos = normals > 0
+            near = (lo @ (normals*n_pos).T) + (hi @ (normals*~n_pos).T) + d
+            far = (hi @ (normals*n_pos).T) + (lo @ (normals*~n_pos).T) + d
+            inside = (far <= 0).all(axis=1)
+            partial = ~inside & ~(near > 0).any(axis=1)
+            found.append(_concat_ranges(starts[inside], ends[inside]))
+            if level == self.depth:
+                candidates = _concat_ranges(starts[partial], ends[partial])
+                idx = self.order[candidates]
+                keep = ((points[idx] @ normals.T + d) <= 0).all(axis=1)
+                found.append(candidates[keep])
+            else:
+                codes = ((codes[partial, None] << 3) + np.arange(8)).ravel()
+        return self.order[np.concatenate(found)]
+
+
+class CulledPointCloud(ArrayPointCloud):
+    def __init__(self, xs, ys, zs, ss=1, color=WHITE, opacity=1, lod_distance=None,
+                 max_points=None, depth=6, **kwargs):
+        """ArrayPointCloud that only shows the points inside the camera frustum,
+        found with an Octree, thinned with distance so that the density on screen
+        stays about constant. Use add_culling_updater(frame) to cull every frame.
+
+        Parameter
+        ---------
+        lod_distance : float
+            distance from the camera within which all points are kept. Beyond it a
+            fixed random subset with a fraction (lod_distance/distance)^2 is kept.
+            None keeps all visible points
+        max_points : int
+            largest number of points shown, None for no limit
+        depth : int
+            depth of the octree
+        """
+        super().__init__(xs, ys, zs, ss, color=color, opacity=opacity, **kwargs)
+        self.lod_distance = lod_distance
+        self.max_points = max_points
+        self.rebuild_index(depth)
+
+    def rebuild_index(self, depth=6):
+        """take the current points as the full cloud and index them. Call this
+        after changing or moving the points."""
+        self.full_data = {key: self.data[key].copy() for key in ("points", "radii", "rgbas")}
+        self.index = Octree(self.full_data["points"], depth)
+        # fixed per point, so that thinning does not flicker between frames
+        self.lod_keys = np.random.default_rng(0).random(len(self.full_data["points"]))
+        return self
+
+    def get_visible_indices(self, frame):
+        """indices into the full cloud of the points to show for a CameraFrame"""
+        points = self.full_data["points"]
+        idx = self.index.query_planes(get_frustum_planes(frame), points)
+        if self.lod_distance is not None:
+            rot = frame.get_inverse_camera_rotation_matrix()
+            distance = frame.get_focal_distance() - (points[idx] - frame.get_center()) @ rot[2]
+            idx = idx[self.lod_keys[idx] < (self.lod_distance/distance)**2]
+        if self.max_points is not None and len(idx) > self.max_points:
+            idx = idx[np.argpartition(self.lod_keys[idx], self.max_points)[:self.max_points]]
+        return np.sort(idx)
+
+    def cull(self, frame):
+        """show only the points that frame sees"""
+        idx = self.get_visible_indices(frame)
+        for key, full in self.full_data.items():
+            self.data[key] = full[idx]
+        self.refresh_bounding_box()
+        return self
+
+    def uncull(self):
+        """show all points again"""
+        for key, full in self.full_data.items():
+            self.data[key] = full.copy()
+        self.refresh_bounding_box()
+        return self
+
+    def add_culling_updater(self, frame):
+        """cull against frame, e.g. self.camera.frame, on every frame"""
+        self.add_updater(lambda m: m.cull(frame))
+        return self
+
+
+class SnapshotPointCloud(ArrayPointCloud):
+    def __init__(self, snapshots, ss=1, color=WHITE, opacity=1, interpolate_positions=False, **kwargs):
+        """ArrayPointCloud that plays a time series of snapshots. Snapshots are read
+        one at a time from an iterable, such as a generator, and the next one is
+        loaded on a background thread while the current one is shown. Only the
+        current and the next snapshots are in memory (and the one after, while it
+        loads, when interpolating), however long the sequence is. Positions are
+        written into the same point array on every step.
+
+        Parameter
+        ---------
+        snapshots : iterable
+            (N, 3) arrays of (x, y, z), or paths to .npy files of them, which are
+            memory-mapped and read on the background thread
+        interpolate_positions : bool
+            whether to move points linearly between snapshots for fractional
+            times, which needs the same points in every snapshot
+        """
+        self._source = iter(snapshots)
+        self._loader = ThreadPoolExecutor(max_workers=1)
+        self.interpolate_positions = interpolate_positions
+        self.snapshot_index = 0
+        self.time = 0
+        self.current = self._fetch()
+        if self.current is None: raise ValueError("No snapshots given")
+        self._next = self._loader.submit(self._fetch)
+        self._buffer = None
+        super().__init__(*self.current.T, ss, color=color, opacity=opacity, **kwargs)
+
+    def _fetch(self):
+        """read the next snapshot into memory, or None at the end"""
+        snapshot = next(self._source, None)
+        if snapshot is None: return None
+        if isinstance(snapshot, str): snapshot = np.load(snapshot, mmap_mode='r')
+        return np.array(snapshot, dtype=float)
+
+    def get_next_snapshot(self):
+        """the next snapshot, waiting for it to load if needed, or None at the end"""
+        return self._next.result()
+
+    def advance(self):
+        """move to the next snapshot, if any, and start loading the one after"""
+        snapshot = self.get_next_snapshot()
+        if snapshot is None: return False
+        self.current = snapshot
+        self.snapshot_index += 1
+        self._next = self._loader.submit(self._fetch)
+        return True
+
+    def set_time(self, t):
+        """show time t in units of snapshots, e.g. 2.5 is half way between the
+        third and the fourth. Time only goes forward as snapshots are streamed."""
+        self.time = t
+        while self.snapshot_index < int(t) and self.advance():
+            pass
+        alpha = t - self.snapshot_index
+        xyz = self.current
+        if self.interpolate_positions and alpha > 0:
+            following = self.get_next_snapshot()
+            if following is not None and following.shape == xyz.shape:
+                if self._buffer is None or self._buffer.shape != xyz.shape:
+                    self._buffer = np.empty_like(xyz)
+                np.subtract(following, xyz, out=self._buffer)
+                self._buffer *= min(alpha, 1)
+                self._buffer += xyz
+                xyz = self._buffer
+        points = self.data["points"]
+        if len(points) == len(xyz):
+            # x*OUT + y*UP + z*RIGHT, in place
+            points[:, 0], points[:, 1], points[:, 2] = xyz[:, 2], xyz[:, 1], xyz[:, 0]
+            self.refresh_bounding_box()
+        else:
+            self.set_positions(xyz)
+        return self
+
+    def add_playback_updater(self, rate=1):
+        """play the snapshots at rate snapshots per second of animation time"""
+        self.add_updater(lambda m, dt: m.set_time(m.time + rate*dt))
+        return self
+
+    def close(self):
+        """stop the background loader"""
+        self._loader.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,82 @@
+"""Timing of slide shows: which slide and stage spends how long where"""
+import csv
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+class Profiler:
+    def __init__(self):
+        """Records timed events, each with a name, the slide and stage it
+        belongs to, its start, duration and thread. Events can be summed up
+        per (sid, stage, name) and written as json, csv or a chrome trace,
+        which can be opened in chrome://tracing or ui.perfetto.dev."""
+        self.t0 = time.perf_counter()
+        self.events = []
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def record(self, name, sid=None, stage=None):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            with self.lock:
+                self.events.append({
+                    "name": name, "sid": sid, "stage": stage,
+                    "start": start - self.t0, "duration": end - start,
+                    "thread": threading.get_ident(),
+                })
+
+    def summary(self):
+        """total time, count and max of each (sid, stage, name), in the order
+        they first happened"""
+        rows = {}
+        for e in self.events:
+            key = (e["sid"], e["stage"], e["name"])
+            row = rows.setdefault(key, {"sid": e["sid"], "stage": e["stage"], "name": e["name"],
+                                        "count": 0, "total": 0., "max": 0.})
+            row["count"] += 1
+            row["total"] += e["duration"]
+            row["max"] = max(row["max"], e["duration"])
+        return list(rows.values())
+
+    def to_json(self, filename):
+        with open(filename, "w") as f:
+            json.dump({"summary": self.summary(), "events": self.events}, f, indent=1)
+
+    def to_csv(self, filename):
+        with open(filename, "w", newline="") as f:
+            writer = csv.DictWriter(f, ["sid", "stage", "name", "count", "total", "max"])
+            writer.writeheader()
+            writer.writerows(self.summary())
+
+    def to_chrome_trace(self, filename):
+        """complete events in the chrome trace event format, in microseconds"""
+        events = [{
+            "name": e["name"], "ph": "X", "pid": os.getpid(), "tid": e["thread"],
+            "ts": e["start"]*1e6, "dur": e["duration"]*1e6,
+            "args": {"sid": e["sid"], "stage": e["stage"]},
+        } for e in self.events]
+        with open(filename, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    def save(self, filename, trace=None):
+        """write the report to filename, as csv if it ends with .csv and as
+        json otherwise, and a chrome trace to trace if given"""
+        if filename.endswith(".csv"):
+            self.to_csv(filename)
+        else:
+            self.to_json(filename)
+        if trace is not None:
+            self.to_chrome_trace(trace)
+
+    def print_summary(self, n=10):
+        """the n most expensive (sid, stage, name)"""
+        rows = sorted(self.summary(), key=lambda row: -row["total"])[:n]
+        for row in rows:
+            print(f"sid {row['sid']} stage {row['stage']} {row['name']}: "
+                  f"{row['total']*1e3:.1f} ms in {row['count']} calls")
@@ -1,5 +1,3 @@
-from manimlib.constants import *
-
 def filter_by_lim(values, lim, return_mask=False):
     if not return_mask:
         return values[(values > lim[0]) * (values < lim[1])]
@@ -8,12 +6,14 @@ def filter_by_lim(values, lim, return_mask=False):
         return values[mask], mask
 
 def c2hex(c):
-    import matplotlib as mpl
-    if '#' not in c: return mpl.colors.to_hex(c)
-    else: return c
+    from vidlib.colors import to_hex
+    if isinstance(c, str) and '#' in c: return c
+    else: return to_hex(c)
 
 def p2refp(p, xaxis=None, yaxis=None):
     """Get reference points on axes"""
+    from manimlib.constants import RIGHT, UP
+    from manimlib.utils.space_ops import line_intersection
     if yaxis is None or xaxis is None:
         dy = p[1]*UP
         dx = p[0]*RIGHT